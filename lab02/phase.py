@@ -1,8 +1,38 @@
 """
 This script provides a way to calculate the moon age of a particular day, as well as a description for the phase of the moon.
+
+For whole calendars, moonAges computes the ages of many dates at once (from
+numpy arrays of months, days and years), and calendar computes the ages
+and phases of every day in a range of dates.  The ages of every day from
+1900 through 2099 may also be saved in a table (buildTable) that loads
+instantly (loadTable).
 """
+import os
+from datetime import date
+from tempfile import NamedTemporaryFile
+
+try:
+    import numpy as np     # optional: needed for calendars of many dates
+except ImportError:
+    np = None
+
 # These items will get imported with "from phase import *":
-__all__ = [ "moonAge", "age2Str" ]
+__all__ = [ "moonAge", "age2Str", "moonAges", "calendar", "buildTable",
+            "loadTable" ]
+
+# the phases of the moon, and the phase (an index into phaseNames) of the
+# moon at each age from 0 through 29
+phaseNames = [ 'new', 'waxing crescent', 'first quarter', 'waxing gibbous',
+               'full', 'waning gibbous', 'third quarter', 'waning crescent' ]
+phaseCodes = [ 0, 0, 1, 1, 1, 1, 1, 2, 2, 3, 3, 3, 3, 3, 4,
+               4, 4, 5, 5, 5, 5, 5, 6, 6, 7, 7, 7, 7, 7, 0 ]
+
+# The table of ages holds one byte for each day from tableStart to
+# tableEnd (exclusive).
+tableStart = date(1900, 1, 1)
+tableEnd = date(2100, 1, 1)
+tableFile = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'phase.table')
 
 def moonAge(month, day, year):
     """Compute the age of the moon based on a month, day, and year.
@@ -27,28 +57,83 @@ def moonAge(month, day, year):
 
 
 def age2Str(age):  # extra credit
-    """Convert a moon age to a textual description."""
-    # currently: returns str version of an int
-    description = int(age)
-    if description == 0 or description == 1 or description == 29:
-        return('new')
-    if description == 2 or description == 3 or description == 4 or description == 5 or description== 6:
-        return('waxing crescent')
-    if description == 7 or description == 8:
-        return('first quarter')
-    if description == 9 or description == 10 or description == 11 or description == 12 or description == 13:
-        return('waxing gibbous')
-    if description == 14 or description == 15 or description == 16:
-        return('full')
-    if description == 17 or description == 18 or description == 19 or description== 20 or description == 21:
-        return('waning gibbous')
-    if description == 22 or description == 23:
-        return('third quarter')
-    if description == 24 or description == 25 or description == 26 or description == 27 or description == 28:
-        return('waning crescent')
-
-
-    
+    """Convert a moon age to a textual description.
+    >>> age2Str(0), age2Str(8), age2Str(15), age2Str(29)
+    ('new', 'first quarter', 'full', 'new')
+    """
+    return phaseNames[phaseCodes[int(age)]]
+
+def moonAges(months, days, years):
+    """Compute the ages of the moon on many dates at once: months, days
+    and years are numpy arrays (or lists) of equal length.  Returns a numpy
+    array of ages.
+    >>> [int(age) for age in moonAges([9, 2], [28, 26], [1967, 2001])]
+    [24, 1]
+    """
+    if np is None:
+        raise ImportError("moonAges requires numpy")
+    months, days, years = (np.asarray(a, dtype=np.int64)
+                           for a in (months, days, years))
+    rsum = months + days + 30 - np.where(years >= 2000, 8, 4)
+    dist = years % 100 % 19
+    dist = np.where(dist < 10, dist, dist - 19)
+    adjust = (np.abs(dist) % 3)*10
+    dist = np.where(dist >= 0, dist + adjust, dist - adjust)
+    return (dist + rsum) % 30
+
+def calendar(start, end):
+    """Compute the moon's age and phase for every day from the date start
+    up to (but not including) the date end.  Returns three numpy arrays:
+    the dates (as numpy datetime64s), the ages, and the phases (indices
+    into phaseNames).
+    >>> dates, ages, phases = calendar(date(2018, 9, 17), date(2018, 9, 22))
+    >>> [int(age) for age in ages]
+    [7, 8, 9, 10, 11]
+    >>> [phaseNames[p] for p in phases[:3]]
+    ['first quarter', 'first quarter', 'waxing gibbous']
+    """
+    if np is None:
+        raise ImportError("calendar requires numpy")
+    dates = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D'))
+    firsts = dates.astype('datetime64[M]')
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    months = firsts.astype(np.int64) % 12 + 1
+    days = (dates - firsts).astype(np.int64) + 1
+    ages = moonAges(months, days, years)
+    return dates, ages, np.asarray(phaseCodes, dtype=np.uint8)[ages]
+
+def buildTable(filename=tableFile):
+    """Save the moon's age on every day from 1900 through 2099, one byte
+    per day, in the file filename.  The table is written to a temporary
+    file that replaces filename only once it is complete."""
+    dates, ages, phases = calendar(tableStart, tableEnd)
+    directory = os.path.dirname(os.path.abspath(filename))
+    with NamedTemporaryFile('wb', dir=directory, delete=False) as out:
+        try:
+            out.write(ages.astype(np.uint8).tobytes())
+        except BaseException:
+            out.close()
+            os.unlink(out.name)
+            raise
+    os.replace(out.name, filename)
+
+def loadTable(filename=tableFile):
+    """Map the table of ages saved in the file filename (building it if
+    necessary).  Returns a numpy array of ages indexed by the number of
+    days since tableStart.  Raises ValueError if the file is not a whole
+    table.
+    >>> table = loadTable()
+    >>> int(table[(date(1967, 9, 28) - tableStart).days])
+    24
+    """
+    if np is None:
+        raise ImportError("loadTable requires numpy")
+    if not os.path.exists(filename):
+        buildTable(filename)
+    if os.path.getsize(filename) != (tableEnd - tableStart).days:
+        raise ValueError("{} is not a table of moon ages".format(filename))
+    return np.memmap(filename, dtype=np.uint8, mode='r')
+
 def main():
     """A method that prompts for a date and prints the moon's age and phase."""
     month = int(input("Month? "))
@@ -58,6 +143,10 @@ def main():
     description = age2Str(age)
     print("On {}/{}/{}, the moon's age is {}, a {} moon.".format(month, day, year, age, description))
 
+def test():
+    from doctest import testmod
+    testmod()
+
 if __name__ == "__main__":
     # The following code is executed when we execute this file as a script:
     main()
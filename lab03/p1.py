@@ -1,18 +1,11 @@
 from wordTools import *
 
 result = []
-vocabs = sized(6, words('words/bodyParts'))
-rvocabs = ["r" + vocab for vocab in vocabs]
-svocabs = sized(7, words('words/bodyParts'))
+rvocabs = Source(words('words/bodyParts'), prefixed('r'), canon, size=6)
+svocabs = Source(words('words/bodyParts'), canon, size=7)
 
-for rvocab in rvocabs:
-        cvocab = canon(rvocab)
-        for svocab in svocabs:
-                csvocab = canon(svocab)
-                if cvocab == csvocab:
-                        result.append(svocab)
-                        result.append((rvocab).strip('r'))
-                else:
-                        continue
+for vocab, svocab in solve(rvocabs, svocabs):
+        result.append(svocab)
+        result.append(vocab)
 
 print(result)
@@ -1,12 +1,11 @@
 from wordTools import *
 
 result = []
-afflictions = sized(5, words('words/diseases'))
+afflictions = RotationIndex(sized(5, words('words/diseases')))
 bibles = sized(5, words('words/bibleNames'))
 
-for affliction in afflictions:
-    name = rotate(affliction)
-    if name in bibles:
+for affliction, name, n in afflictions.pairs(bibles):
+    if n == 13:
         result.append(name)
     else:
         continue
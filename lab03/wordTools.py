@@ -0,0 +1,1394 @@
+# Tools for reading word lists and solving word puzzles.
+
+# This publicly documents the module:
+"""
+This module reads lists of words from files and supports the solving of
+word-based trivia problems (from NPR, the New York Times, etc.).
+
+Word lists are read with words(filename) and filtered by length with
+sized(n, wordList).  Word files are memory-mapped and indexed by length on
+demand, and each file is read only once, so repeated queries against a large
+dictionary are cheap.  Individual words may be put in a canonical form
+(canon), rotated through the alphabet (rotate), or checked for repeated
+letters (isIsogram).
+
+For anagram problems over long lists, an AnagramIndex buckets every word
+by its canonical form once, so that finding anagrams is a dictionary lookup:
+    >>> index = AnagramIndex(['stop', 'pots', 'tops', 'python'])
+    >>> index.anagrams('SPOT')
+    ['stop', 'pots', 'tops']
+
+This documentation is visible with
+    pydoc3 wordTools
+"""
+
+# __all__ is a list of names of objects imported with
+#   from wordTools import *
+# make sure you update this variable as you add useful methods!
+__all__ = [ "words", "sized", "canon", "rotate", "isIsogram",
+            "letterMask", "WordList", "WordFeatures", "features",
+            "countWords", "filterWords", "mapWords",
+            "LetterTable", "letterCounts", "anagramPhrases",
+            "AnagramIndex", "rotationKey", "RotationIndex",
+            "Dawg", "dawg", "BloomFilter",
+            "prefixed", "suffixed", "rotated", "lowered", "Source", "solve" ]
+
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from multiprocessing import Pool
+from tempfile import NamedTemporaryFile
+from itertools import combinations_with_replacement, product
+from math import log
+from operator import eq, le, sub
+
+try:
+    import numpy as np     # optional: needed only by LetterTable
+except ImportError:
+    np = None
+
+lowers = "abcdefghijklmnopqrstuvwxyz"
+uppers = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Word lists that have been read, keyed by filename.  Each entry remembers
+# the modification time and size of the file when it was read, so that a
+# changed file is read again.
+_wordLists = dict()
+
+# a stripped, non-empty line of a word file
+_wordPattern = re.compile(rb'\S(?:[^\r\n]*\S)?')
+
+class WordList(object):
+    """A read-only list of the words found in a file, one per line.
+
+    The file is memory-mapped rather than parsed into strings: the list
+    keeps only the byte offsets of each word, and a word is decoded when it
+    is accessed.  The first time words of a particular length are requested
+    (see sized), the words are bucketed by length, so later requests cost
+    nothing more than the size of the bucket.
+    """
+
+    __slots__ = ['_filename', '_data', '_starts', '_ends', '_ascii',
+                 '_buckets']
+
+    def __init__(self, filename):
+        """Map the file named filename and locate its words.
+        >>> wl = WordList('words/bodyParts')
+        >>> wl[124]
+        'skeleton'
+        >>> len(wl) == len(open('words/bodyParts').read().splitlines())
+        True
+        """
+        self._filename = filename
+        with open(filename, 'rb') as wordFile:
+            if os.fstat(wordFile.fileno()).st_size:
+                self._data = mmap.mmap(wordFile.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+            else:  # empty files cannot be mapped
+                self._data = b''
+        self._starts = array('q')
+        self._ends = array('q')
+        for match in _wordPattern.finditer(self._data):
+            self._starts.append(match.start())
+            self._ends.append(match.end())
+        # with only ASCII text, the length of a word is its size in bytes
+        self._ascii = re.search(rb'[\x80-\xff]', self._data) is None
+        self._buckets = None
+
+    def _word(self, i):
+        """Decode the i-th word of the file."""
+        return self._data[self._starts[i]:self._ends[i]].decode('utf-8')
+
+    def _wordLength(self, i):
+        """The length, in characters, of the i-th word of the file."""
+        if self._ascii:
+            return self._ends[i] - self._starts[i]
+        return len(self._word(i))
+
+    def sized(self, n):
+        """Return a view of the words that are exactly n letters long.
+        >>> wl = WordList('words/bodyParts')
+        >>> 'skeleton' in wl.sized(8)
+        True
+        >>> list(wl.sized(1))
+        []
+        """
+        if self._buckets is None:
+            buckets = dict()
+            for i in range(len(self._starts)):
+                length = self._wordLength(i)
+                bucket = buckets.get(length)
+                if bucket is None:
+                    bucket = buckets[length] = array('q')
+                bucket.append(i)
+            self._buckets = buckets
+        return WordView(self, self._buckets.get(n, ()))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._word(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("word index out of range")
+        return self._word(i)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        for i in range(len(self._starts)):
+            yield self._word(i)
+
+    def __eq__(self, other):
+        return _sameWords(self, other)
+
+    def __repr__(self):
+        return "WordList({!r})".format(self._filename)
+
+class WordView(object):
+    """A lazy, read-only view of selected words of a WordList."""
+
+    __slots__ = ['_wordList', '_indices']
+
+    def __init__(self, wordList, indices):
+        self._wordList = wordList
+        self._indices = indices
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._wordList._word(j) for j in self._indices[i]]
+        return self._wordList._word(self._indices[i])
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __iter__(self):
+        for i in self._indices:
+            yield self._wordList._word(i)
+
+    def __eq__(self, other):
+        return _sameWords(self, other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+def _sameWords(a, b):
+    """Whether a, a WordList or WordView, holds the same words as the list,
+    WordList or WordView b."""
+    if not isinstance(b, (list, WordList, WordView)):
+        return NotImplemented
+    return len(a) == len(b) and all(map(eq, a, b))
+
+# All functions go below here.
+def words(filename):
+    """Opens and reads words found in a file named with the string filename,
+    returns the resulting list of words (a WordList).
+
+    A file is read only once; asking again for the words of an unchanged
+    file returns the same list.  So the list is read-only, and shared by
+    every caller: copy it (with list()) to change it.  It compares equal to
+    a list of the same words.
+
+    >>> words('words/dict')[161131]
+    'python'
+    >>> words('words/bodyParts')[124]
+    'skeleton'
+    >>> words('words/dict') is words('words/dict')
+    True
+    """
+    info = os.stat(filename)
+    stamp = (info.st_mtime_ns, info.st_size)
+    cached = _wordLists.get(filename)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    result = WordList(filename)
+    _wordLists[filename] = (stamp, result)
+    return result
+
+def sized(n, wordList):
+    """Returns the words of wordList that are exactly n letters long.
+    The words of a WordList are returned as a lazy view of its words.
+
+    >>> sized(3, ['a', 'cat', 'dog', 'horse'])
+    ['cat', 'dog']
+    >>> sized(8, words('words/bodyParts'))[:2]
+    ['adenoids', 'appendix']
+    >>> parts = words('words/bodyParts')
+    >>> sized(4, parts) == sized(4, list(parts))
+    True
+    """
+    if isinstance(wordList, WordList):
+        return wordList.sized(n)
+    return [word for word in wordList if len(word) == n]
+
+def canon(word):
+    """Returns a canonical version of word:
+       * lower case letters
+       * in alphabetical order
+       * no spaces
+
+    >>> canon('Mia')
+    'aim'
+    >>> canon('iAm')
+    'aim'
+    >>> canon('a lot')
+    'alot'
+    """
+    result = word.lower().replace(' ', '').strip()
+    result = ''.join(sorted(result))
+    return result
+
+def rotate(s, n=13):
+    """Take the letters of the string s and rotate them n positions in
+    the alphabet.
+    >>> rotate('HAL', n=1)
+    'IBM'
+    >>> rotate('vend')
+    'iraq'
+    """
+    result = ''
+    for c in s:
+        if c in lowers:
+            idx = lowers.index(c)
+            idx = (idx + n)%26
+            c = lowers[idx]
+        elif c in uppers:
+            idx = uppers.index(c)
+            idx = (idx + n)%26
+            c = uppers[idx]
+        result += c
+    return result
+
+def isIsogram(word):
+    """Returns true if the letters of the word are unique.
+
+    >>> isIsogram('Unique')
+    False
+    >>> isIsogram('python')
+    True
+    """
+    result = len(set(word.lower())) == len(word)
+    return result
+
+def letterMask(word):
+    """Returns an integer whose bit i is set when the i-th letter of the
+    alphabet appears in word (in either case).  Non-letters are ignored.
+
+    >>> letterMask('cab')
+    7
+    >>> letterMask('Abba') == letterMask('ab')
+    True
+    """
+    mask = 0
+    for c in word.lower():
+        if c in lowers:
+            mask |= 1 << lowers.index(c)
+    return mask
+
+# Feature sidecar files are named after the word file they describe.
+# Layout: a header (see _featureHeader), then four arrays of 32-bit
+# unsigned integers -- word lengths, canonical form ids, letter masks, and
+# the offsets of each canonical form within -- a final blob of the distinct
+# canonical forms, encoded in UTF-8.
+_featureSuffix = '.features'
+_dawgSuffix = '.dawg'
+_featureMagic = b'WTFEAT01'
+_featureHeader = struct.Struct('=8s8sqqqq')   # magic, byte order, mtime,
+                                              # size, #words, #canonical forms
+
+def _replaceFile(filename, write):
+    """Call write(f) on a new temporary file f, next to filename, and then
+    move it into place, so that the file filename is never seen partly
+    written."""
+    directory = os.path.dirname(os.path.abspath(filename))
+    with NamedTemporaryFile('wb', dir=directory, delete=False) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, filename)
+
+class WordFeatures(object):
+    """Precomputed features of each word in a word file: its length, the id
+    of its canonical form (equal ids mean the words are anagrams), and its
+    letter mask (see letterMask).
+
+    Features are saved in a sidecar file next to the word file.  Loading
+    the sidecar maps it into memory and involves no parsing at all; it is
+    rebuilt whenever the word file changes.
+    """
+
+    __slots__ = ['lengths', 'canonIds', 'masks', '_canonOffsets',
+                 '_canonData', '_data']
+
+    def __init__(self, lengths, canonIds, masks, canonOffsets, canonData,
+                 data=None):
+        self.lengths = lengths
+        self.canonIds = canonIds
+        self.masks = masks
+        self._canonOffsets = canonOffsets
+        self._canonData = canonData
+        self._data = data        # keeps the mapped file open, if any
+
+    @staticmethod
+    def compute(wordList):
+        """Compute the features of the words of wordList."""
+        lengths, canonIds, masks = array('I'), array('I'), array('I')
+        canonOffsets = array('I', [0])
+        canonData = bytearray()
+        ids = dict()
+        for word in wordList:
+            key = canon(word)
+            cid = ids.get(key)
+            if cid is None:
+                cid = ids[key] = len(ids)
+                canonData += key.encode('utf-8')
+                canonOffsets.append(len(canonData))
+            lengths.append(len(word))
+            canonIds.append(cid)
+            masks.append(letterMask(word))
+        return WordFeatures(lengths, canonIds, masks, canonOffsets,
+                            bytes(canonData))
+
+    def save(self, filename, stamp):
+        """Write these features to the file filename.  The stamp is the
+        (mtime, size) pair of the word file they were computed from."""
+        header = _featureHeader.pack(_featureMagic,
+                                     sys.byteorder.encode().ljust(8),
+                                     stamp[0], stamp[1], len(self.lengths),
+                                     len(self._canonOffsets) - 1)
+        def write(sidecar):
+            sidecar.write(header)
+            for table in (self.lengths, self.canonIds, self.masks,
+                          self._canonOffsets):
+                sidecar.write(table)
+            sidecar.write(self._canonData)
+        _replaceFile(filename, write)
+
+    @staticmethod
+    def load(filename, stamp):
+        """Map the features saved in the file filename.  Returns None if the
+        file is missing, unreadable, of the wrong size, or was computed from
+        a different version (stamp) of the word file."""
+        try:
+            with open(filename, 'rb') as sidecar:
+                data = mmap.mmap(sidecar.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(data) < _featureHeader.size:
+            return None
+        magic, order, mtime, size, n, k = _featureHeader.unpack_from(data)
+        if (magic != _featureMagic or order.rstrip() != sys.byteorder.encode()
+                or (mtime, size) != stamp):
+            return None
+        offset = _featureHeader.size
+        if len(data) < offset + 4*(3*n + k + 1):
+            return None
+        view = memoryview(data)
+        tables = []
+        for count in (n, n, n, k + 1):
+            end = offset + 4*count
+            tables.append(view[offset:end].cast('I'))
+            offset = end
+        if len(data) != offset + tables[3][k]:
+            return None
+        canonData = view[offset:]
+        return WordFeatures(*tables, canonData, data=data)
+
+    def canon(self, i):
+        """The canonical form of the i-th word.
+        >>> f = WordFeatures.compute(['Mia', 'python', 'aim'])
+        >>> f.canon(2), f.canonIds[0] == f.canonIds[2]
+        ('aim', True)
+        """
+        cid = self.canonIds[i]
+        start, end = self._canonOffsets[cid], self._canonOffsets[cid + 1]
+        return bytes(self._canonData[start:end]).decode('utf-8')
+
+    def __len__(self):
+        return len(self.lengths)
+
+def features(filename):
+    """Returns the WordFeatures of the words in the file filename, loading
+    them from the file's sidecar when it is current, and otherwise computing
+    them (and saving a new sidecar, if possible).
+
+    >>> f = features('words/bodyParts')
+    >>> wl = words('words/bodyParts')
+    >>> len(f) == len(wl)
+    True
+    >>> f.canon(124) == canon(wl[124]) and f.masks[124] == letterMask(wl[124])
+    True
+    """
+    info = os.stat(filename)
+    stamp = (info.st_mtime_ns, info.st_size)
+    sidecar = filename + _featureSuffix
+    result = WordFeatures.load(sidecar, stamp)
+    if result is None:
+        result = WordFeatures.compute(words(filename))
+        try:
+            result.save(sidecar, stamp)
+        except OSError:
+            pass   # e.g. a read-only directory: use the computed features
+    return result
+
+# Parallel scans.
+# A word file is split into byte ranges that begin and end on line
+# boundaries; each range is scanned by a separate process, and the results
+# are combined in the order of the file.
+
+def _chunks(filename, count):
+    """Split the file filename into at most count (start, end) byte ranges
+    that begin and end at line boundaries."""
+    size = os.stat(filename).st_size
+    bounds = [0]
+    with open(filename, 'rb') as wordFile:
+        for k in range(1, count):
+            position = max(size*k//count, bounds[-1])
+            wordFile.seek(position)
+            if position:
+                wordFile.readline()    # finish the line containing position
+            position = wordFile.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+def _scanChunk(task):
+    """Apply a function to the words of one range of a word file.  The
+    task is (filename, start, end, function, how): how is 'count', 'filter'
+    or 'map'."""
+    filename, start, end, function, how = task
+    with open(filename, 'rb') as wordFile:
+        wordFile.seek(start)
+        text = wordFile.read(end - start).decode('utf-8')
+    chunk = [word for word in map(str.strip, text.splitlines()) if word]
+    if how == 'count':
+        return sum(1 for word in chunk if function(word))
+    if how == 'filter':
+        return [word for word in chunk if function(word)]
+    return [function(word) for word in chunk]
+
+def _scan(filename, function, how, processes):
+    """Scan the words of filename with a pool of processes."""
+    processes = processes or os.cpu_count() or 1
+    # several ranges per process even out the work
+    tasks = [(filename, start, end, function, how)
+             for start, end in _chunks(filename, 4*processes)]
+    if processes == 1 or len(tasks) <= 1:
+        return list(map(_scanChunk, tasks))
+    with Pool(processes) as pool:
+        return pool.map(_scanChunk, tasks)
+
+def countWords(filename, predicate, processes=None):
+    """Count the words of the file filename for which predicate is true.
+    Pieces of the file are scanned by a pool of worker processes, one per
+    core unless processes says how many.
+    The predicate must be picklable: a function defined at the top level of
+    a module, not a lambda.
+
+    >>> countWords('words/dict', isIsogram)
+    40683
+    """
+    return sum(_scan(filename, predicate, 'count', processes))
+
+def filterWords(filename, predicate, processes=None):
+    """Return the list of words of the file filename for which the picklable
+    predicate is true, in the order of the file.  See countWords.
+    >>> filterWords('words/bodyParts', isIsogram, processes=3)[:3]
+    ['abdomen', 'ankle', 'anus']
+    """
+    return [word for chunk in _scan(filename, predicate, 'filter', processes)
+            for word in chunk]
+
+def mapWords(filename, mapper, processes=None):
+    """Return the list of results of the picklable function mapper applied
+    to each word of the file filename, in the order of the file.
+    >>> mapWords('words/dict', canon)[161131]
+    'hnopty'
+    """
+    return [value for chunk in _scan(filename, mapper, 'map', processes)
+            for value in chunk]
+
+class AnagramIndex(object):
+    """An index of a list of words, bucketed by canonical form.
+
+    Every word is canonicalized exactly once, when the index is built.
+    Afterwards, finding the anagrams of a word is a single dictionary
+    lookup, and matching two indexes against each other is a hash join on
+    their canonical forms, rather than a comparison of every pair of words.
+    """
+
+    __slots__ = ['_buckets']
+
+    def __init__(self, wordList):
+        """Build an index of the words in wordList.
+        >>> index = AnagramIndex(['Mia', 'aim', 'python'])
+        >>> len(index)
+        3
+        """
+        self._buckets = dict()
+        for word in wordList:
+            self.add(word)
+
+    def add(self, word):
+        """Add word to the index."""
+        key = canon(word)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [word]
+        else:
+            bucket.append(word)
+
+    def anagrams(self, word):
+        """Return the list of indexed words that are anagrams of word.
+        Words are listed in the order they were added to the index.
+
+        >>> index = AnagramIndex(words('words/frenchCities'))
+        >>> index.anagrams('Nice')
+        ['Nice']
+        >>> index.anagrams('xyzzy')
+        []
+        """
+        return list(self._buckets.get(canon(word), []))
+
+    def classes(self):
+        """Generate the lists of words that are mutual anagrams, for every
+        canonical form with more than one word.
+        >>> list(AnagramIndex(['stop', 'cat', 'pots', 'act', 'dog']).classes())
+        [['stop', 'pots'], ['cat', 'act']]
+        """
+        for bucket in self._buckets.values():
+            if len(bucket) > 1:
+                yield list(bucket)
+
+    def pairs(self, other):
+        """Return a list of (word, otherWord) pairs, where word is from this
+        index, otherWord is from the index (or word list) other, and the two
+        are anagrams of each other.
+        >>> french = AnagramIndex(['Paris', 'Lyon', 'Nice'])
+        >>> french.pairs(['Pisa', 'Roma', 'Ncie'])
+        [('Nice', 'Ncie')]
+        """
+        if not isinstance(other, AnagramIndex):
+            other = AnagramIndex(other)
+        result = []
+        for key, bucket in self._buckets.items():
+            match = other._buckets.get(key)
+            if match is None:
+                continue
+            for word in bucket:
+                for otherWord in match:
+                    result.append((word, otherWord))
+        return result
+
+    def __contains__(self, word):
+        """Return True if an anagram of word appears in the index."""
+        return canon(word) in self._buckets
+
+    def __iter__(self):
+        """Generate the indexed words."""
+        for bucket in self._buckets.values():
+            for word in bucket:
+                yield word
+
+    def __len__(self):
+        """The number of words in the index."""
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+def _lettersMask(letters):
+    """The letter mask of letters, as a 32-bit numpy integer."""
+    return np.uint32(letterMask(letters))
+
+class LetterTable(object):
+    """The letters of a whole list of words, as numpy arrays:
+      t.masks   - the letter mask (see letterMask) of each word
+      t.counts  - a row of 26 letter counts for each word
+      t.lengths - the length of each word
+    Queries over the table are vectorized: each returns an array of bools,
+    one per word, that may be counted with sum() or turned back into words
+    with select().  Letter case is ignored, and only the letters a through z
+    are considered.
+
+    >>> t = LetterTable(['python', 'Unique', 'banana', 'tap'])
+    >>> t.select(t.isograms())
+    ['python', 'tap']
+    >>> int(t.usesOnly('abnpt').sum())
+    2
+    """
+
+    __slots__ = ['_words', 'masks', 'counts', 'lengths']
+
+    def __init__(self, wordList):
+        """Tabulate the letters of the words in wordList."""
+        if np is None:
+            raise ImportError("LetterTable requires numpy")
+        self._words = wordList
+        words = [word.lower().encode('ascii', 'replace') for word in wordList]
+        n = len(words)
+        self.lengths = np.fromiter(map(len, words), dtype=np.int64, count=n)
+        # translate every character of every word to a letter number,
+        # 0 through 25, or 26 for non-letters
+        codes = np.frombuffer(b''.join(words), dtype=np.uint8)
+        table = np.full(256, 26, dtype=np.uint8)
+        table[np.frombuffer(lowers.encode(), dtype=np.uint8)] = np.arange(26)
+        letters = table[codes]
+        owners = np.repeat(np.arange(n), self.lengths)
+        counts = np.zeros((n, 27), dtype=np.int32)
+        np.add.at(counts, (owners, letters), 1)
+        self.counts = counts[:, :26]
+        bits = (self.counts > 0).astype(np.uint32)
+        bits <<= np.arange(26, dtype=np.uint32)
+        self.masks = bits.sum(axis=1, dtype=np.uint32)
+
+    def isograms(self):
+        """Which words have no repeated letters."""
+        return (self.counts <= 1).all(axis=1)
+
+    def usesOnly(self, letters):
+        """Which words use no letters other than those of letters."""
+        return (self.masks & ~_lettersMask(letters)) == 0
+
+    def containsAll(self, letters):
+        """Which words contain every letter of letters.
+        >>> t = LetterTable(['python', 'typhoon', 'tap'])
+        >>> t.select(t.containsAll('PT'))
+        ['python', 'typhoon', 'tap']
+        >>> t.select(t.containsAll('oo'))
+        ['python', 'typhoon']
+        """
+        required = _lettersMask(letters)
+        return (self.masks & required) == required
+
+    def within(self, letters):
+        """Which words can be spelled with the letters of letters, using
+        each letter no more often than it appears in letters.
+        >>> t = LetterTable(['python', 'typhoon', 'tap'])
+        >>> t.select(t.within('no python'))
+        ['python', 'typhoon']
+        >>> LetterTable(['aa']).within('a'*256).tolist()
+        [True]
+        """
+        available = LetterTable([letters]).counts[0]
+        return (self.counts <= available).all(axis=1)
+
+    def sized(self, n):
+        """Which words are exactly n letters long."""
+        return self.lengths == n
+
+    def select(self, which):
+        """The list of words for which the array of bools which is True."""
+        return [self._words[i] for i in np.flatnonzero(which)]
+
+    def __len__(self):
+        return len(self.lengths)
+
+def letterCounts(word):
+    """Returns a tuple of 26 counts, the number of times each letter of the
+    alphabet appears in word (in either case).  Non-letters are ignored.
+
+    >>> letterCounts('Abba')[:3]
+    (2, 2, 0)
+    """
+    counts = [0]*26
+    for c in word.lower():
+        if c in lowers:
+            counts[lowers.index(c)] += 1
+    return tuple(counts)
+
+def anagramPhrases(phrase, wordList, maxWords=3, minWords=1):
+    """Return the phrases of minWords to maxWords words from wordList that
+    use exactly the letters of phrase, as tuples of words.  Letter case,
+    spaces and punctuation are ignored.  Each phrase is reported once;
+    words that are anagrams of one another are listed in the order they
+    appear in wordList.
+
+    Words are represented by their letter counts.  The word list is first
+    reduced to the words whose letters can be drawn from phrase, and words
+    with the same letters are grouped.  A depth-first search then draws one
+    group at a time from the remaining letters, remembering the outcome for
+    each (remaining letters, next group, words left) it meets.
+
+    >>> anagramPhrases('dormitory', ['dirty', 'room', 'dormitory', 'moor'],
+    ...                maxWords=2)
+    [('dormitory',), ('dirty', 'room'), ('dirty', 'moor')]
+    >>> anagramPhrases('dirty room', ['room', 'dirty', 'room'])
+    [('room', 'dirty')]
+    >>> phrases = anagramPhrases('astronomer', words('words/dict'))
+    >>> ('starer', 'moon') in phrases
+    True
+    """
+    target = letterCounts(phrase)
+    targetMask = letterMask(phrase)
+    groups = dict()
+    for word in wordList:
+        if letterMask(word) & ~targetMask:
+            continue
+        counts = letterCounts(word)
+        if not any(counts) or not all(map(le, counts, target)):
+            continue
+        group = groups.get(counts)
+        if group is None:
+            groups[counts] = [word]
+        elif word not in group:     # a repeated word adds no new phrases
+            group.append(word)
+    keys = list(groups)
+    position = {counts: i for i, counts in enumerate(keys)}
+    longest = max(map(sum, keys), default=0)
+    memo = dict()
+
+    def search(remaining, start, left):
+        """The lists of group indices, start or later and in order, that
+        exactly use up the remaining letters in at most left words."""
+        if not any(remaining):
+            return [()]
+        if left == 0 or sum(remaining) > left*longest:
+            return []
+        # a single word must use all that remains: look it up
+        last = position.get(remaining, -1)
+        found = [(last,)] if last >= start else []
+        if left == 1:
+            return found
+        state = (remaining, start, left)
+        if state not in memo:
+            for i in range(start, len(keys)):
+                counts = keys[i]
+                if all(map(le, counts, remaining)):
+                    rest = tuple(map(sub, remaining, counts))
+                    if any(rest):
+                        for tail in search(rest, i, left - 1):
+                            found.append((i,) + tail)
+            memo[state] = found
+        return memo[state]
+
+    result = []
+    for combination in search(target, 0, maxWords):
+        if len(combination) < minWords:
+            continue
+        # a group used more than once contributes its words in order
+        choices = []
+        for i in set(combination):
+            choices.append(combinations_with_replacement(groups[keys[i]],
+                                                         combination.count(i)))
+        for picks in product(*choices):
+            result.append(tuple(word for pick in picks for word in pick))
+    return result
+
+def _firstLetter(word):
+    """The alphabet position of the first letter of word, or None."""
+    for c in word:
+        if c in lowers:
+            return lowers.index(c)
+    return None
+
+def rotationKey(word):
+    """Returns a signature of word that is shared by all of its rotations
+    (see rotate): the lower case word, rotated so that its first letter
+    is 'a'.  Two words are related by some rotation exactly when their
+    signatures are equal.
+
+    >>> rotationKey('HAL') == rotationKey('ibm')
+    True
+    >>> rotationKey('iraq'), rotationKey('vend')
+    ('ajsi', 'ajsi')
+    """
+    word = word.lower()
+    first = _firstLetter(word)
+    if first is None:
+        return word
+    return rotate(word, -first)
+
+def _shift(word, otherWord):
+    """The rotation n for which rotate(word, n) matches otherWord."""
+    first = _firstLetter(word.lower())
+    otherFirst = _firstLetter(otherWord.lower())
+    if first is None:
+        return 0
+    return (otherFirst - first) % 26
+
+class RotationIndex(object):
+    """An index of a list of words, bucketed by rotation signature
+    (see rotationKey).
+
+    One pass over a list builds the index; afterwards every rotation
+    (rot-n, for any n) of a word that appears in the index is found with a
+    single dictionary lookup.  Letter case is ignored when matching.
+    """
+
+    __slots__ = ['_buckets']
+
+    def __init__(self, wordList):
+        """Build an index of the words in wordList.
+        >>> len(RotationIndex(['iraq', 'vend', 'HAL']))
+        3
+        """
+        self._buckets = dict()
+        for word in wordList:
+            self.add(word)
+
+    def add(self, word):
+        """Add word to the index."""
+        key = rotationKey(word)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [word]
+        else:
+            bucket.append(word)
+
+    def rotations(self, word):
+        """Return a list of (indexedWord, n) pairs, one for each indexed word
+        that is rotate(word, n), up to case.  Shifts are between 0 and 25.
+
+        >>> index = RotationIndex(['IBM', 'vend', 'iraq'])
+        >>> index.rotations('HAL')
+        [('IBM', 1)]
+        >>> index.rotations('iraq')
+        [('vend', 13), ('iraq', 0)]
+        """
+        bucket = self._buckets.get(rotationKey(word), [])
+        return [(other, _shift(word, other)) for other in bucket]
+
+    def pairs(self, other):
+        """Return a list of (word, otherWord, n) triples, where word is from
+        this index, otherWord is from the index (or word list) other, and
+        otherWord is rotate(word, n), up to case.
+        >>> index = RotationIndex(['cheer', 'adder', 'sleep'])
+        >>> index.pairs(['jolly', 'beef', 'purls'])
+        [('cheer', 'jolly', 7)]
+        """
+        if not isinstance(other, RotationIndex):
+            other = RotationIndex(other)
+        result = []
+        for key, bucket in self._buckets.items():
+            match = other._buckets.get(key)
+            if match is None:
+                continue
+            for word in bucket:
+                for otherWord in match:
+                    result.append((word, otherWord, _shift(word, otherWord)))
+        return result
+
+    def __contains__(self, word):
+        """Return True if some rotation of word appears in the index."""
+        return rotationKey(word) in self._buckets
+
+    def __iter__(self):
+        """Generate the indexed words."""
+        for bucket in self._buckets.values():
+            for word in bucket:
+                yield word
+
+    def __len__(self):
+        """The number of words in the index."""
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+class _DawgNode(object):
+    """A state of a word graph under construction."""
+    __slots__ = ['edges', 'final']
+
+    def __init__(self):
+        self.edges = dict()
+        self.final = False
+
+    def signature(self):
+        """States with equal signatures accept the same suffixes."""
+        edges = sorted(self.edges.items())
+        return (self.final, tuple((c, id(child)) for c, child in edges))
+
+# Dawg files: a header (see _dawgHeader) followed by the arrays of a Dawg,
+# all of 32-bit unsigned integers except the 64-bit length masks.
+_dawgMagic = b'WTDAWG02'
+_dawgHeader = struct.Struct('=8s8sqqqqq') # magic, byte order, mtime, size,
+                                          # #words, #states, #edges
+
+class Dawg(object):
+    """A directed acyclic word graph: a minimal automaton that accepts
+    exactly the words of a word list.  Words that share prefixes share a
+    path from the start state, and words that share suffixes share a path
+    into the accepting states, so a large dictionary occupies a fraction of
+    the memory of a list of strings.
+
+    The graph is stored in flat arrays.  State s has the edges numbered
+    first[s] through first[s+1]-1, sorted by label; edge e is labeled with
+    the character chr(labels[e]) and leads to state targets[e].  Bit i of
+    lengths[s] is set when a word ends i characters beyond state s, so
+    searches for words of a given length are pruned early.  State 0 is the
+    start state.
+
+    >>> d = Dawg(['tap', 'taps', 'top', 'tops', 'python'])
+    >>> 'tops' in d, 'to' in d
+    (True, False)
+    >>> list(d.startingWith('ta'))
+    ['tap', 'taps']
+    >>> list(d.matching('t?p'))
+    ['tap', 'top']
+    >>> len(d)
+    5
+    """
+
+    __slots__ = ['_count', '_first', '_labels', '_targets', '_lengths',
+                 '_data']
+
+    def __init__(self, wordList=(), _tables=None):
+        """Build the graph of the words of wordList."""
+        self._data = None
+        if _tables is not None:
+            (self._count, self._first, self._labels, self._targets,
+             self._lengths, self._data) = _tables
+            return
+        root = _DawgNode()
+        register = dict()
+        unchecked = []    # (parent, label, child) edges not yet minimized
+
+        def minimize(depth):
+            while len(unchecked) > depth:
+                parent, c, child = unchecked.pop()
+                key = child.signature()
+                if key in register:
+                    parent.edges[c] = register[key]
+                else:
+                    register[key] = child
+
+        previous = ''
+        count = 0
+        for word in sorted(set(wordList)):
+            common = 0
+            while (common < len(word) and common < len(previous)
+                   and word[common] == previous[common]):
+                common += 1
+            minimize(common)
+            node = unchecked[-1][2] if unchecked else root
+            for c in word[common:]:
+                child = _DawgNode()
+                node.edges[c] = child
+                unchecked.append((node, c, child))
+                node = child
+            node.final = True
+            previous = word
+            count += 1
+        minimize(0)
+        self._count = count
+        self._flatten(root)
+
+    def _flatten(self, root):
+        """Number the states of the graph rooted at root and store them in
+        flat arrays."""
+        number = {id(root): 0}
+        order = [root]
+        for node in order:     # breadth-first; order grows as we go
+            for c in sorted(node.edges):
+                child = node.edges[c]
+                if id(child) not in number:
+                    number[id(child)] = len(order)
+                    order.append(child)
+        self._first = array('I', [0])
+        self._labels = array('I')
+        self._targets = array('I')
+        for node in order:
+            for c in sorted(node.edges):
+                self._labels.append(ord(c))
+                self._targets.append(number[id(node.edges[c])])
+            self._first.append(len(self._labels))
+        # a state's length mask depends on those of its children, so visit
+        # the states in post-order
+        lengths = [None]*len(order)
+
+        def measure(node):
+            s = number[id(node)]
+            if lengths[s] is None:
+                mask = 1 if node.final else 0
+                for child in node.edges.values():
+                    mask |= measure(child) << 1
+                lengths[s] = mask & 0xffffffffffffffff
+            return lengths[s]
+
+        measure(root)
+        self._lengths = array('Q', lengths)
+
+    def _step(self, state, c):
+        """The state reached from state along the edge labeled c, or None."""
+        lo, hi = self._first[state], self._first[state + 1]
+        code = ord(c)
+        e = bisect_left(self._labels, code, lo, hi)
+        if e < hi and self._labels[e] == code:
+            return self._targets[e]
+        return None
+
+    def _walk(self, prefix):
+        """The state reached by reading prefix, or None."""
+        state = 0
+        for c in prefix:
+            state = self._step(state, c)
+            if state is None:
+                break
+        return state
+
+    def _words(self, state, prefix):
+        """Generate, in order, the words accepted from state, preceded by
+        prefix."""
+        if self._lengths[state] & 1:
+            yield prefix
+        for e in range(self._first[state], self._first[state + 1]):
+            yield from self._words(self._targets[e],
+                                   prefix + chr(self._labels[e]))
+
+    def startingWith(self, prefix):
+        """Generate, in order, the words that begin with prefix."""
+        state = self._walk(prefix)
+        if state is not None:
+            yield from self._words(state, prefix)
+
+    def matching(self, pattern, wildcard='?'):
+        """Generate, in order, the words that match pattern, a string in
+        which each wildcard character matches any single character.
+        >>> d = dawg('words/dict')
+        >>> list(d.matching('pyth??'))
+        ['python']
+        >>> sevens = list(d.matching('???????'))
+        >>> len(sevens) == len(sized(7, words('words/dict')))
+        True
+        """
+        n = len(pattern)
+
+        def search(state, i, prefix):
+            if not (self._lengths[state] >> (n - i)) & 1:
+                return          # no word of the right length is reachable
+            if i == n:
+                yield prefix
+                return
+            c = pattern[i]
+            if c == wildcard:
+                for e in range(self._first[state], self._first[state + 1]):
+                    yield from search(self._targets[e], i + 1,
+                                      prefix + chr(self._labels[e]))
+            else:
+                target = self._step(state, c)
+                if target is not None:
+                    yield from search(target, i + 1, prefix + c)
+
+        if n < 64:
+            yield from search(0, 0, '')
+
+    def save(self, filename, stamp=(0, 0)):
+        """Write this graph to the file filename.  The stamp is the
+        (mtime, size) pair of the word file it was built from, if any."""
+        header = _dawgHeader.pack(_dawgMagic, sys.byteorder.encode().ljust(8),
+                                  stamp[0], stamp[1], self._count,
+                                  len(self._lengths), len(self._labels))
+        def write(dawgFile):
+            dawgFile.write(header)
+            for table in (self._lengths, self._first, self._labels,
+                          self._targets):
+                dawgFile.write(table)
+        _replaceFile(filename, write)
+
+    @staticmethod
+    def load(filename, stamp=None):
+        """Map a graph saved (see save) in the file filename.  Raises
+        ValueError if the file is not a whole word graph file, or, if stamp
+        is given, was saved with a different stamp."""
+        with open(filename, 'rb') as dawgFile:
+            data = mmap.mmap(dawgFile.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < _dawgHeader.size:
+            raise ValueError("{} is not a word graph file".format(filename))
+        (magic, order, mtime, size,
+         count, states, edges) = _dawgHeader.unpack_from(data)
+        if (magic != _dawgMagic or order.rstrip() != sys.byteorder.encode()
+                or len(data) != (_dawgHeader.size + 8*states
+                                 + 4*(states + 1 + 2*edges))):
+            raise ValueError("{} is not a word graph file".format(filename))
+        if stamp is not None and (mtime, size) != stamp:
+            raise ValueError("{} is out of date".format(filename))
+        view = memoryview(data)
+        offset = _dawgHeader.size
+        tables = []
+        for code, size, n in (('Q', 8, states), ('I', 4, states + 1),
+                              ('I', 4, edges), ('I', 4, edges)):
+            tables.append(view[offset:offset + size*n].cast(code))
+            offset += size*n
+        lengths, first, labels, targets = tables
+        return Dawg(_tables=(count, first, labels, targets, lengths, data))
+
+    def __contains__(self, word):
+        state = self._walk(word)
+        return state is not None and bool(self._lengths[state] & 1)
+
+    def __iter__(self):
+        return self._words(0, '')
+
+    def __len__(self):
+        return self._count
+
+def dawg(filename):
+    """Returns the Dawg of the words in the file filename.  The graph is
+    saved beside the word file, and loaded from there, without rebuilding,
+    for as long as the word file is unchanged.
+    >>> 'python' in dawg('words/dict')
+    True
+    """
+    info = os.stat(filename)
+    stamp = (info.st_mtime_ns, info.st_size)
+    graphFile = filename + _dawgSuffix
+    try:
+        return Dawg.load(graphFile, stamp)
+    except (OSError, ValueError):
+        pass
+    result = Dawg(words(filename))
+    try:
+        result.save(graphFile, stamp)
+    except OSError:
+        pass
+    return result
+
+# Bloom filter files: a header (see _bloomHeader) followed by the bits.
+_bloomMagic = b'WTBLOOM2'
+_bloomHeader = struct.Struct('=8s8sqqq')   # magic, byte order,
+                                           # #bits, #hashes, #words
+
+class BloomFilter(object):
+    """A compact, approximate set of words.
+
+    A Bloom filter remembers each word by setting a few bits of a bit
+    array, chosen by hashing the word.  A word that was added is always
+    found; a word that was not is found (falsely) with a small probability,
+    rate, chosen when the filter is built.  The filter takes about
+    10 bits per word at a 1% rate, and lookups take constant time.
+
+    When an exact collection of the words (for example, a Dawg) is given,
+    every apparent hit is checked against it, so no false answers are given,
+    while most misses are still answered by the filter alone.
+
+    >>> b = BloomFilter(words('words/bibleNames'), rate=0.001)
+    >>> 'Abel' in b
+    True
+    >>> names = words('words/bibleNames')
+    >>> b = BloomFilter(names, exact=dawg('words/bibleNames'))
+    >>> 'Abel' in b, 'Zyzzy' in b
+    (True, False)
+    """
+
+    __slots__ = ['_bits', '_size', '_hashes', '_count', 'exact']
+
+    def __init__(self, wordList=(), rate=0.01, exact=None, _state=None):
+        """Build a filter of the words of wordList, with false positive
+        rate rate, and that checks hits against exact, if given."""
+        self.exact = exact
+        if _state is not None:
+            self._bits, self._size, self._hashes, self._count = _state
+            return
+        if not 0 < rate < 1:
+            raise ValueError("rate must be between 0 and 1")
+        if not isinstance(wordList, (list, tuple, WordList)):
+            wordList = list(wordList)
+        n = max(len(wordList), 1)
+        self._size = max(8, int(-n*log(rate)/log(2)**2))
+        self._hashes = max(1, round(self._size/n*log(2)))
+        self._bits = bytearray((self._size + 7)//8)
+        self._count = 0
+        for word in wordList:
+            self.add(word)
+
+    def _positions(self, word):
+        """The bit positions that represent word."""
+        digest = blake2b(word.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i*h2) % self._size for i in range(self._hashes)]
+
+    def add(self, word):
+        """Add word to the filter."""
+        for p in self._positions(word):
+            self._bits[p >> 3] |= 1 << (p & 7)
+        self._count += 1
+
+    def save(self, filename):
+        """Write this filter to the file filename."""
+        header = _bloomHeader.pack(_bloomMagic,
+                                   sys.byteorder.encode().ljust(8),
+                                   self._size, self._hashes, self._count)
+        def write(bloomFile):
+            bloomFile.write(header)
+            bloomFile.write(self._bits)
+        _replaceFile(filename, write)
+
+    @staticmethod
+    def load(filename, exact=None, writable=False):
+        """Map a filter saved (see save) in the file filename; hits are
+        checked against exact, if given.  The mapped filter is read-only:
+        words may be added only if writable is True, in which case the bits
+        are copied into memory instead.
+        >>> import os, tempfile
+        >>> b = BloomFilter(words('words/diseases'))
+        >>> path = os.path.join(tempfile.mkdtemp(), 'diseases.bloom')
+        >>> b.save(path)
+        >>> 'Measles' in BloomFilter.load(path)
+        True
+        >>> b = BloomFilter.load(path, writable=True)
+        >>> b.add('Zyzzy fever')
+        >>> 'Zyzzy fever' in b
+        True
+        """
+        with open(filename, 'rb') as bloomFile:
+            data = mmap.mmap(bloomFile.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < _bloomHeader.size:
+            raise ValueError("{} is not a Bloom filter file".format(filename))
+        magic, order, size, hashes, count = _bloomHeader.unpack_from(data)
+        if (magic != _bloomMagic or order.rstrip() != sys.byteorder.encode()
+                or len(data) != _bloomHeader.size + (size + 7)//8):
+            raise ValueError("{} is not a Bloom filter file".format(filename))
+        bits = memoryview(data)[_bloomHeader.size:]
+        if writable:
+            bits = bytearray(bits)
+        return BloomFilter(exact=exact, _state=(bits, size, hashes, count))
+
+    def __contains__(self, word):
+        for p in self._positions(word):
+            if not self._bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return self.exact is None or word in self.exact
+
+    def __len__(self):
+        """The number of words added to the filter."""
+        return self._count
+
+# Puzzle queries.
+# A puzzle is stated as a number of sources of words, each with a series
+# of transforms that compute a key from each word.  Its solutions are the
+# combinations of one word from each source whose keys are all equal.
+
+def prefixed(prefix):
+    """A transform that adds prefix to the front of a word.
+    >>> prefixed('r')('ear')
+    'rear'
+    """
+    return lambda word: prefix + word
+
+def suffixed(suffix):
+    """A transform that adds suffix to the end of a word.
+    >>> suffixed('s')('ear')
+    'ears'
+    """
+    return lambda word: word + suffix
+
+def rotated(n=13):
+    """A transform that rotates the letters of a word n positions.
+    >>> rotated(1)('HAL')
+    'IBM'
+    """
+    return lambda word: rotate(word, n)
+
+def lowered(word):
+    """A transform that puts a word in lower case."""
+    return word.lower()
+
+class Source(object):
+    """A source of words for a puzzle query: a word list (or the name of a
+    word file), optionally limited to words of a given size, and the
+    transforms applied, in order, to compute the key of each word.  A
+    transform may return None to drop a word from the puzzle.
+
+    >>> src = Source('words/bodyParts', prefixed('r'), canon, size=6)
+    >>> src.key('tonsil')
+    'ilnorst'
+    """
+
+    __slots__ = ['words', 'transforms']
+
+    def __init__(self, wordList, *transforms, size=None):
+        if isinstance(wordList, str):
+            wordList = words(wordList)
+        if size is not None:
+            wordList = sized(size, wordList)
+        self.words = wordList
+        self.transforms = transforms
+
+    def key(self, word):
+        """The key of word, or None if the word is dropped."""
+        for transform in self.transforms:
+            word = transform(word)
+            if word is None:
+                break
+        return word
+
+    def keys(self):
+        """Generate (key, word) pairs for the words of this source."""
+        for word in self.words:
+            key = self.key(word)
+            if key is not None:
+                yield key, word
+
+    def table(self):
+        """A dictionary mapping each key to the words that have it."""
+        result = dict()
+        for key, word in self.keys():
+            bucket = result.get(key)
+            if bucket is None:
+                result[key] = [word]
+            else:
+                bucket.append(word)
+        return result
+
+    def __len__(self):
+        return len(self.words)
+
+def solve(*sources, where=None):
+    """Return the solutions of the puzzle described by sources: a list of
+    tuples, one word from each source, in order, whose keys are all equal.
+    If where is given, it is a predicate on the words of a solution that
+    must also hold.
+
+    The puzzle is solved with a hash join: every source except the largest
+    is tabulated by key, and the words of the largest source are streamed
+    through, probing the smallest tables first.  Solutions are listed in the
+    order of the largest source.
+
+    >>> solve(Source('words/bodyParts', prefixed('r'), canon, size=6),
+    ...       Source('words/bodyParts', canon, size=7))
+    [('tonsil', 'nostril')]
+    >>> cheer = Source(['cheer', 'sleep'], rotationKey)
+    >>> jolly = Source(['jolly', 'beef'], rotationKey)
+    >>> solve(cheer, jolly)
+    [('cheer', 'jolly')]
+    >>> solve(cheer, jolly, where=lambda a, b: rotate(a, 13) == b)
+    []
+    """
+    if not sources:
+        return []
+    streamed = max(range(len(sources)), key=lambda i: len(sources[i]))
+    tables = dict()
+    for i, source in enumerate(sources):
+        if i != streamed:
+            tables[i] = source.table()
+    probes = sorted(tables, key=lambda i: len(tables[i]))
+    result = []
+    for key, word in sources[streamed].keys():
+        matches = []
+        for i in probes:
+            match = tables[i].get(key)
+            if match is None:
+                break
+            matches.append((i, match))
+        else:
+            choices = [None]*len(sources)
+            choices[streamed] = [word]
+            for i, match in matches:
+                choices[i] = match
+            for solution in product(*choices):
+                if where is None or where(*solution):
+                    result.append(solution)
+    return result
+
+if __name__ == '__main__':
+    # The following code is executed when you run wordTools as a script:
+    from doctest import testmod
+    testmod()  # test this module, according to the doctests
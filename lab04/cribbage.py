@@ -15,14 +15,32 @@ focuses on statically scoring the cards in a hand.  Here are the possibilities:
   double pair royal (12pts): any four cards with the same rank scores 12 points.
   run of n (n points): any n=3 or more cards of increasing rank scores n points.
 
+For simulations, the score of every 5-card hand may be computed once and
+saved in a table (see buildTable), after which a 5-card hand is scored by
+a single lookup (tableScore).
+
+Given the six cards dealt to a player, bestDiscard determines which two to
+throw away so that the expected score of the hand, over every possible
+starter card, is greatest.
+
 Run this program in the following manner:
    python3 cribbage.py 2S 2D 2H 9C 9S
    The score is ?.
+or, to find the best discards from a file of deals, one deal of six cards
+per line (the file "-" is the standard input):
+   python3 cribbage.py -d deals.txt
 """  
 
-from tools import subsets
+import mmap
+import os
+from itertools import combinations
+from math import comb
+from multiprocessing import Pool
+from tempfile import NamedTemporaryFile
 
-__all__ = [ "fullDeck", "points", "rank", "deal", "sortHand", "score" ]
+__all__ = [ "fullDeck", "points", "rank", "score", "encode", "scoreCodes",
+            "handIndex", "buildTable", "loadTable", "tableScore",
+            "discardValues", "bestDiscard", "bestDiscards" ]
 
 # characters used for names of face values on cards
 faceNames = 'A23456789TJQK'
@@ -35,7 +53,16 @@ ptsTable = {'A':1,'2':2,'3':3,'4':4,'5':5,'6':6,'7':7,'8':8,'9':9,
             'T':10,'J':10,'Q':10,'K':10}
 
 # a full deck of 52 cards
-fullDeck = [ face+suit for face in faceNames and for suit in suitNames]
+fullDeck = [ face+suit for face in faceNames for suit in suitNames]
+
+# Cards may be encoded as small integers, their positions in fullDeck:
+# the code of a card is 4*rank + suit, so its rank is code//4.
+cardCodes = { card: code for code, card in enumerate(fullDeck) }
+
+# rank and point value of each face, and of each card code
+rankTable = { face: r for r, face in enumerate(faceNames) }
+codeRanks = [ code//4 for code in range(52) ]
+codePoints = [ ptsTable[card[0]] for card in fullDeck ]
 
 def points(card):
     """Given a 2-letter card name (e.g. 'AS', ace of spaces), compute the
@@ -61,7 +88,14 @@ def rank(card): # WORKS
     >>> rank('JD') == rank('QD')
     False
     """
-    return faceNames.index(card[0])
+    return rankTable[card[0]]
+
+def encode(hand):
+    """Encode the cards of hand as integer codes (see cardCodes).
+    >>> encode(['AH', '2C', 'KS'])
+    [0, 5, 51]
+    """
+    return [cardCodes[card] for card in hand]
 
 def count15s(hand):
     """Count the number of ways a hand of cards sums to 15.
@@ -69,16 +103,27 @@ def count15s(hand):
     0
     >>> count15s(['TS','QD','5H','2S','3D'])
     4
+    >>> count15s(fullDeck)
+    17264
     """
-    count = 0
-    # check all subsets of the hand for those that total 15
-    for cards in subsets(hand):
-        if len(cards) >= 2:
-            # check for sum to 15:
-            pointTotal = sum([points(card) for card in cards])
-            if pointTotal == 15:
-                count += 1
-    return count
+    return _count15s(encode(hand))
+
+def _count15s(codes):
+    """Count the subsets of the encoded cards that total 15 points."""
+    return _sumWays(codes)[15]
+
+def _sumWays(codes):
+    """Return a list, ways, where ways[t] is the number of subsets of the
+    encoded cards that total t points, for t from 0 to 15.
+    Rather than enumerate the subsets, we tally them card by card."""
+    ways = [1] + [0]*15     # ways[t]: subsets so far that total t
+    for code in codes:
+        p = codePoints[code]
+        for t in range(15, p-1, -1):
+            ways[t] += ways[t-p]
+    # no single card is worth 15, so every subset counted in ways[15]
+    # has 2 or more cards
+    return ways
 
 def rankingHistogram(hand):
     """Return a list of counts of cards at each rank from 0 through 12.
@@ -89,12 +134,15 @@ def rankingHistogram(hand):
     >>> rankingHistogram(fullDeck)
     [4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4]
     """
+    return _histogram(encode(hand))
+
+def _histogram(codes):
+    """The ranking histogram of the encoded cards."""
     # make a list, 13 long, all 0:
     hist = [0]*13
     # now, tally the number of cards with each rank
-    for card in hand:
-        cardRank = rank(card)
-        hist[cardRank] += 1
+    for code in codes:
+        hist[codeRanks[code]] += 1
     return hist
 
 def score(hand):
@@ -117,22 +165,27 @@ def score(hand):
     12
     >>> score(['TS','JS','QS','KS','5D']) # 4 15s, a run of 4
     12
+    >>> score(fullDeck) # large hands are scored as quickly as small ones
+    872449916
     """
-    sc = 2 * count15s(hand)
+    return scoreCodes(encode(hand))
 
-    # for the remaining scoring, we
-    # develop a histogram of card rankings
-    hist = rankingHistogram(hand)
+def scoreCodes(codes):
+    """Compute the score of a hand of encoded cards (see encode).
+    >>> scoreCodes(encode(['3H','4D','2D','5S','5D']))
+    12
+    """
+    return 2 * _count15s(codes) + _histogramScore(_histogram(codes))
 
-    # score pairs (2-of-a-kind), pairs royal (3-of), double pairs royal (4-of)
+def _histogramScore(hist):
+    """The points for pairs and runs in a hand with ranking histogram hist."""
+    sc = 0
+
+    # score pairs: every pair of cards with the same rank counts 2, so
+    # 2-of-a-kind is 2, pairs royal (3-of) 6, double pairs royal (4-of) 12
     for rk in range(13):
         # each entry in histogram counts cards with a particular face
-        if hist[rk] == 2:
-            sc += 2
-        elif hist[rk] == 3:
-            sc += 6  # thought: 3 of-a-kind is 3 pairs
-        elif hist[rk] == 4:
-            sc += 12 # thought: 4 of-a-kind is 6 pairs
+        sc += hist[rk] * (hist[rk]-1)
 
     # counting runs
     # we scan through the histogram, looking for runs of non-zero values
@@ -140,31 +193,199 @@ def score(hand):
     # (Think about how product is involved with counting similar runs.)
     runLength = 0
     product = 1
-    runPoints = None
-    for rk in range(13):
-        # consider cards with rank rk.
-        if hist[rk] > 0:
+    for rk in range(14):
+        # consider cards with rank rk (there are none beyond the king)
+        if rk < 13 and hist[rk] > 0:
             # some cards with rank rk; increase run length
             runLength += 1
             product *= hist[rk]
         else:
             # no cards at this rank; *count prior runs*
             if runLength >= 3:
-                runPoints += runLength * product
+                sc += runLength * product
             # reset the run-counting
             runLength = 0
             product = 1
-
-    sc += runPoints
     return sc
 
+# The table of 5-card hand scores.  Each hand has an index between 0 and
+# C(52,5)-1, given by the "combinatorial number system": with its card
+# codes in increasing order, c1 < c2 < ... < c5, the index of the hand is
+#    C(c1,1) + C(c2,2) + C(c3,3) + C(c4,4) + C(c5,5).
+# The table file is a short header followed by one byte, the score, for
+# each hand, in order of index.
+tableFile = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'cribbage5.table')
+_tableMagic = b'CRIB5TB1'
+_tableSize = comb(52, 5)
+_choose = [[comb(n, k) for k in range(6)] for n in range(53)]
+_table = None    # the table most recently loaded by loadTable
+
+def handIndex(hand):
+    """The index of a 5-card hand, given as card names or codes.
+    >>> handIndex(['AH','AC','AD','AS','2H'])
+    0
+    >>> handIndex(fullDeck[-5:])
+    2598959
+    """
+    codes = sorted(encode(hand) if isinstance(hand[0], str) else hand)
+    return sum(_choose[c][i] for i, c in enumerate(codes, 1))
+
+def _tableSlice(top):
+    """Scores of the hands whose highest card code is top, in index order.
+    Scores only depend on ranks, so they are computed once per set of
+    ranks."""
+    start = _choose[top][5]
+    scores = bytearray(_choose[top+1][5] - start)
+    known = dict()
+    topRank = codeRanks[top]
+    for cards in combinations(range(top), 4):
+        ranks = tuple(codeRanks[c] for c in cards) + (topRank,)
+        sc = known.get(ranks)
+        if sc is None:
+            sc = known[ranks] = scoreCodes(cards + (top,))
+        index = (_choose[cards[0]][1] + _choose[cards[1]][2] +
+                 _choose[cards[2]][3] + _choose[cards[3]][4])
+        scores[index] = sc
+    return bytes(scores)
+
+def buildTable(filename=tableFile, processes=None):
+    """Compute the score of every 5-card hand and save them, in order of
+    hand index, in the file filename.  The hands are scored in a pool of
+    worker processes (one per core, unless processes is given; 1 scores
+    them in this process).  The table is written to a
+    temporary file that replaces filename only once it is complete, so
+    processes that build it at the same time never see a partial table."""
+    tops = range(4, 52)
+    directory = os.path.dirname(os.path.abspath(filename))
+    with NamedTemporaryFile('wb', dir=directory, delete=False) as out:
+        try:
+            out.write(_tableMagic)
+            if processes == 1:
+                for chunk in map(_tableSlice, tops):
+                    out.write(chunk)
+            else:
+                with Pool(processes) as pool:
+                    for chunk in pool.imap(_tableSlice, tops):
+                        out.write(chunk)
+        except BaseException:
+            out.close()
+            os.unlink(out.name)
+            raise
+    os.replace(out.name, filename)
+
+def loadTable(filename=tableFile):
+    """Map the table of 5-card hand scores saved in the file filename,
+    building it first if it does not exist.  The table is shared, page for
+    page, by every process that maps it."""
+    global _table
+    if not os.path.exists(filename):
+        buildTable(filename)
+    with open(filename, 'rb') as source:
+        data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    if (data[:len(_tableMagic)] != _tableMagic or
+            len(data) != len(_tableMagic) + _tableSize):
+        raise ValueError("{} is not a cribbage table".format(filename))
+    _table = memoryview(data)[len(_tableMagic):]
+    return _table
+
+def tableScore(hand, table=None):
+    """The score of a 5-card hand, looked up in table (by default, the
+    table most recently loaded, or the default table).
+    >>> hand = ['3H','4D','2D','5S','5D']
+    >>> tableScore(hand) == score(hand)
+    True
+    """
+    if table is None:
+        table = _table if _table is not None else loadTable()
+    return table[handIndex(hand)]
+
+# point value of the cards of each rank
+rankPoints = [ min(rk+1, 10) for rk in range(13) ]
+
+def discardValues(hand):
+    """Given six dealt cards, return a list of (discard, expected) pairs,
+    one for each of the 15 ways to discard two cards, where expected is the
+    average score of the four kept cards with each of the 46 possible
+    starter cards.
+
+    A starter only changes the score through its rank, so the hand is
+    scored once for each rank, using the ways to reach each total and the
+    ranking histogram of the kept cards, and weighed by the number of
+    unseen cards of that rank.  Raises ValueError unless hand is six
+    distinct cards.
+    >>> [d for d, e in discardValues(['5H','5D','JS','JC','AS','2D'])][:3]
+    [['5H', '5D'], ['5H', 'JS'], ['5H', 'JC']]
+    >>> discardValues(['5H','5H','JS','JC','AS','2D'])
+    Traceback (most recent call last):
+      ...
+    ValueError: a deal is six distinct cards, not 5H 5H JS JC AS 2D
+    """
+    if len(hand) != 6 or len(set(hand)) != 6:
+        raise ValueError("a deal is six distinct cards, not {}".format(
+            ' '.join(hand)))
+    codes = encode(hand)
+    unseen = [4 - count for count in _histogram(codes)]
+    starters = sum(unseen)
+    result = []
+    for i, j in combinations(range(len(codes)), 2):
+        keep = [c for k, c in enumerate(codes) if k != i and k != j]
+        ways = _sumWays(keep)
+        hist = _histogram(keep)
+        total = 0
+        for rk in range(13):
+            if unseen[rk]:
+                hist[rk] += 1
+                fifteens = ways[15] + ways[15-rankPoints[rk]]
+                total += unseen[rk] * (2*fifteens + _histogramScore(hist))
+                hist[rk] -= 1
+        result.append(([hand[i], hand[j]], total/starters))
+    return result
+
+def bestDiscard(hand):
+    """Return (discard, keep, expected): the two cards of six dealt cards
+    to discard to maximize the expected score of the kept cards with the
+    starter card, and that expected score.
+    >>> discard, keep, expected = bestDiscard(['5H','5D','JS','JC','AS','2D'])
+    >>> discard, keep, round(expected, 3)
+    (['AS', '2D'], ['5H', '5D', 'JS', 'JC'], 13.826)
+    """
+    values = discardValues(hand)
+    # the pairs of discardValues are in the order of combinations
+    best = max(range(len(values)), key=lambda k: values[k][1])
+    i, j = list(combinations(range(len(hand)), 2))[best]
+    keep = [card for k, card in enumerate(hand) if k != i and k != j]
+    discard, expected = values[best]
+    return discard, keep, expected
+
+def bestDiscards(deals, processes=None):
+    """Generate the best discard (see bestDiscard) for each deal in the
+    iterable deals, in order, handing batches of deals to a pool of worker
+    processes as for buildTable."""
+    if processes == 1:
+        yield from map(bestDiscard, deals)
+    else:
+        with Pool(processes) as pool:
+            yield from pool.imap(bestDiscard, deals, chunksize=256)
+
+def discardReport(filename):
+    """Print the best discard for each deal found in the file filename."""
+    from sys import stdin
+    source = stdin if filename == '-' else open(filename)
+    with source:
+        deals = (line.split() for line in source if line.strip())
+        for discard, keep, expected in bestDiscards(deals):
+            print("keep {} discard {} expect {:.3f}".format(
+                ' '.join(keep), ' '.join(discard), expected))
+
 def test():
     from doctest import testmod
     testmod()
     
 if __name__ == "__main__":
     from sys import argv
-    hand = argv[1:]
-    print("The score is {}.".format(score(hand)))
-
-    
+    if len(argv) > 1 and argv[1] == '-d':
+        discardReport(argv[2] if len(argv) > 2 else '-')
+    else:
+        hand = argv[1:]
+        print("The score is {}.".format(score(hand)))
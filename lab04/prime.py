@@ -5,12 +5,46 @@ or not the value is prime.
 
 Run this like:
     python3 prime.py 21
+
+To test many numbers, name a file of integers (or "-", for the standard
+input) after -f; a line is printed for each number as it is tested:
+    python3 prime.py -f ids.txt
+
+To list, or count, the primes p with A <= p < B:
+    python3 prime.py -r A B
+    python3 prime.py -c A B
 """
-__all__ = ['isPrime']
+from itertools import compress
+from math import isqrt
+from multiprocessing import Pool
+from random import randrange
+
+__all__ = ['isPrime', 'isPrimeMany', 'primesBetween', 'countPrimes']
+
+# primes used for trial division before the Miller-Rabin test
+_smallPrimes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47,
+                53, 59, 61, 67, 71, 73, 79, 83, 89, 97]
 
+# Miller-Rabin with these bases correctly decides every n < 2**64
+_bases64 = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+
+def _witness(a, d, s, n):
+    """Return True if a proves that n (with n-1 == d * 2**s, d odd) is
+    composite."""
+    x = pow(a, d, n)
+    if x == 1 or x == n-1:
+        return False
+    for _ in range(s-1):
+        x = x*x % n
+        if x == n-1:
+            return False
+    return True
 
-def isPrime(n):
+def isPrime(n, rounds=20):
     """Return True if and only if n is prime.
+    Numbers below 2**64 are decided exactly.  Larger numbers are tested
+    with rounds random Miller-Rabin bases: a composite number is reported
+    prime with probability less than 4**-rounds.
     >>> isPrime(1)
     False
     >>> isPrime(2)
@@ -23,20 +57,133 @@ def isPrime(n):
     False
     >>> isPrime(15)
     False
+    >>> isPrime(18446744073709551557)   # the largest prime below 2**64
+    True
+    >>> isPrime(3215031751)             # a strong pseudoprime to 2, 3, 5, 7
+    False
+    >>> isPrime(2**127 - 1)
+    True
     """
-    if n <= 2:
-        return n == 2
-    f = 2
-    while f*f <= n:
-        if (n%f) == 0:
+    if n < 2:
+        return False
+    for p in _smallPrimes:
+        if n % p == 0:
+            return n == p
+    if n < _smallPrimes[-1]**2:
+        return True
+    # write n-1 as d * 2**s, with d odd
+    d, s = n-1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    if n < 2**64:
+        bases = _bases64
+    else:
+        bases = [randrange(2, n-1) for _ in range(rounds)]
+    for a in bases:
+        if _witness(a, d, s, n):
             return False
-        f = f+1
     return True
 
-if __name__ == "__main__":
-    from sys import argv
-    n = int(argv[1]) if len(argv)>1 else 10
-    if isPrime(n):
+def isPrimeMany(numbers, rounds=20):
+    """Generate, in order, whether each of the integers of the iterable
+    numbers is prime (see isPrime).
+    >>> list(isPrimeMany([2, 4, 97, 561]))
+    [True, False, True, False]
+    """
+    for n in numbers:
+        yield isPrime(n, rounds)
+
+# The sieve of Eratosthenes, in segments.
+# A segment covers the odd numbers of a range [lo, hi); it is a bytearray
+# with a 1 for each odd number not yet known to be composite.  Multiples of
+# each odd prime up to the square root of hi are struck out, so that
+# memory is bounded by the size of a segment, not of the whole range.
+_segmentSize = 1 << 21     # numbers covered by each segment
+_sievePrimes = []          # odd primes used by the segments of a sieve
+
+def _oddPrimesTo(limit):
+    """The odd primes up to and including limit."""
+    if limit < 3:
+        return []
+    flags = bytearray([1]) * ((limit-1)//2)   # 3, 5, 7, ..., limit
+    for i in range((isqrt(limit)-1)//2):
+        if flags[i]:
+            p = 2*i + 3
+            start = (p*p - 3)//2
+            flags[start::p] = bytes(len(range(start, len(flags), p)))
+    return list(compress(range(3, limit+1, 2), flags))
+
+def _sieveSegment(lo, hi, oddPrimes):
+    """Return (first, flags): flags marks the primes among the odd numbers
+    first, first+2, ... below hi, where first is the least odd number at
+    least lo."""
+    first = lo | 1
+    flags = bytearray([1]) * max(0, (hi - first + 1)//2)
+    for p in oddPrimes:
+        if p*p >= hi:
+            break
+        # the first odd multiple of p, at least p*p, in the segment
+        start = max(p*p, (first + p - 1)//p*p)
+        if start % 2 == 0:
+            start += p
+        index = (start - first)//2
+        flags[index::p] = bytes(len(range(index, len(flags), p)))
+    if first == 1 and flags:
+        flags[0] = 0           # 1 is not prime
+    return first, flags
+
+def _segments(a, b, size):
+    """Split [a, b) into ranges of at most size numbers."""
+    return [(lo, min(lo + size, b)) for lo in range(a, b, size)]
+
+def primesBetween(a, b, segment=_segmentSize):
+    """Generate, in order, the primes p with a <= p < b.  Only one segment
+    of segment numbers is sieved at a time.
+    >>> list(primesBetween(0, 30))
+    [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    >>> list(primesBetween(10**12, 10**12 + 100))
+    [1000000000039, 1000000000061, 1000000000063, 1000000000091]
+    """
+    a = max(a, 0)
+    if a <= 2 < b:
+        yield 2
+    oddPrimes = _oddPrimesTo(isqrt(max(b-1, 0)))
+    for lo, hi in _segments(a, b, segment):
+        first, flags = _sieveSegment(lo, hi, oddPrimes)
+        yield from compress(range(first, hi, 2), flags)
+
+def _useSievePrimes(oddPrimes):
+    """Initialize a sieving process with the odd primes it needs."""
+    global _sievePrimes
+    _sievePrimes = oddPrimes
+
+def _countSegment(bounds):
+    """Count the odd primes in the range bounds."""
+    return _sieveSegment(bounds[0], bounds[1], _sievePrimes)[1].count(1)
+
+def countPrimes(a, b, processes=None, segment=_segmentSize):
+    """Count the primes p with a <= p < b.  The range is sieved in segments
+    of segment numbers, each counted by one of a pool of worker processes
+    (one per core, unless processes is given).
+    >>> countPrimes(0, 10**6)
+    78498
+    >>> countPrimes(10**9, 10**9 + 10**5, processes=2)
+    4832
+    """
+    a = max(a, 0)
+    count = 1 if a <= 2 < b else 0
+    oddPrimes = _oddPrimesTo(isqrt(max(b-1, 0)))
+    segments = _segments(a, b, segment)
+    if processes == 1 or len(segments) <= 1:
+        _useSievePrimes(oddPrimes)
+        return count + sum(map(_countSegment, segments))
+    with Pool(processes, _useSievePrimes, (oddPrimes,)) as pool:
+        return count + sum(pool.imap_unordered(_countSegment, segments))
+
+def _report(n, prime):
+    """Print whether n is prime."""
+    if prime:
         print("{} is prime.".format(n))
     else:
         print("{} is not prime.".format(n))
@@ -44,3 +191,23 @@ if __name__ == "__main__":
 def test():
     from doctest import testmod
     testmod()
+
+if __name__ == "__main__":
+    from sys import argv, stdin
+    if len(argv) > 1 and argv[1] == '-f':
+        filename = argv[2] if len(argv) > 2 else '-'
+        source = stdin if filename == '-' else open(filename)
+        with source:
+            numbers = (int(word) for line in source for word in line.split())
+            for n in numbers:
+                _report(n, isPrime(n))
+    elif len(argv) > 3 and argv[1] == '-r':
+        for p in primesBetween(int(argv[2]), int(argv[3])):
+            print(p)
+    elif len(argv) > 3 and argv[1] == '-c':
+        a, b = int(argv[2]), int(argv[3])
+        print("There are {} primes p with {} <= p < {}.".format(
+            countPrimes(a, b), a, b))
+    else:
+        n = int(argv[1]) if len(argv)>1 else 10
+        _report(n, isPrime(n))
@@ -16,14 +16,28 @@ Here are some examples of how "translate" might be used:
    >>> translate('Hello!', 'aeiouyAEIOUY', '************')
    'H*ll*!'
 
-Typically, this script reads lines from the input, encrypts them, and 
-writes the result to the output.
+Typically, this script reads the input, encrypts it, and writes the result
+to the output.  The input is read as bytes, in large blocks, so inputs of
+any size (and any encoding) pass through quickly.
 """
+from functools import lru_cache
+
 __all__ = [ "translate", "rot" ]
 
 lowers = "abcdefghijklmnopqrstuvwxyz"
 uppers = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
+@lru_cache(maxsize=64)
+def _table(before,after):
+    """A translation table (for str.translate) that replaces the characters
+    of 'before' with the corresponding characters of 'after'.  Should a
+    character appear in 'before' more than once, its first replacement is
+    used.  Tables are remembered, so each is built only once."""
+    table = {}
+    for b, a in zip(before, after):
+        table.setdefault(ord(b), a)
+    return table
+
 def translate(s,before,after):
     """In 's' replace the letters of the string 'before' with corresponding
        characters from 'after'.
@@ -32,19 +46,12 @@ def translate(s,before,after):
     >>> translate('Hello!', 'aeiouyAEIOUY', '************')
     'H*ll*!'
     """
-    # we accumulate the answer in result
-    result = ''
-    n = len(before)
-    for c in s:
-        # find the location of c in before and replace it with
-        # the corresponding character from after
-        for i in range(n):
-            if c == before[i]:
-                c = after[i]
-        # append the character --- whatever it is --- to end of result
-                break
-        result += c   
-    return result
+    return s.translate(_table(before,after))
+
+def _rotated(letters,n):
+    """The string of letters, rotated n positions."""
+    n = n % len(letters)
+    return letters[n:] + letters[:n]
 
 def rot(s,n=13):
     """Perform rot-n character exchange on string s.
@@ -57,23 +64,30 @@ def rot(s,n=13):
     >>> rot('Nowhere')
     'Abjurer'
     """
-    # First, rotate the lower-case letters
-    s1 = translate(s,lowers,lowers[n:] + lowers[:n])
-    # Next, rotate the upper-case letters
-    s2 = translate(s1,uppers,uppers[n:] + uppers[:n])
-    return s2
+    # rotate the lower- and upper-case letters at once
+    return translate(s, lowers+uppers, _rotated(lowers,n) + _rotated(uppers,n))
 
 def test():
     from doctest import testmod
     testmod()
 
-def crypt():
-    """Encrypt the lines from the input onto the output."""
-    from sys import stdin
-    for line in stdin:
-        line = line.rstrip()
-        line = rot(line)
-        print(line)
+def crypt(n=13, source=None, dest=None, blockSize=1<<20):
+    """Encrypt the input onto the output, a block of blockSize bytes at a
+    time.  Only the ASCII letters are rotated; all other bytes are copied
+    unchanged.  By default, source and dest are the standard input and
+    output, read and written as bytes."""
+    from sys import stdin, stdout
+    source = source or stdin.buffer
+    dest = dest or stdout.buffer
+    letters = (lowers+uppers).encode('ascii')
+    rotated = (_rotated(lowers,n) + _rotated(uppers,n)).encode('ascii')
+    table = bytes.maketrans(letters, rotated)
+    while True:
+        block = source.read(blockSize)
+        if not block:
+            break
+        dest.write(block.translate(table))
+    dest.flush()
 
 if __name__ == "__main__":
     crypt()
@@ -4,15 +4,47 @@ This program allows you to shuffle the values passed as arguments.
 
 This program may be run as follows:
    python3 shuffle.py a b c
-   c a b 
+   c a b
+or, to shuffle the lines of a file (of any size) onto the output, or to
+pick k of its lines at random:
+   python3 shuffle.py -f lines.txt
+   python3 shuffle.py -k 10 lines.txt
+
+Shuffles draw from the random module unless given a random number
+generator.  For reproducible work split among several processes, use
+generators(seed, count) to make one independent generator per process:
+each generator produces the same stream every time it is made with the
+same seed.  Generators from numpy (made with numpy=True) shuffle very
+long lists quickly, by computing the whole permutation at once.
+
+Inputs too large for memory are handled by sample, which keeps a random
+selection of k items while reading through an iterator once, and by
+shuffleFile, which deals the lines of a file into temporary files at
+random and then shuffles each of those in memory.
 """
 
-from random import randint, seed
+import os
+from itertools import islice
+from math import exp, floor, log
+from random import Random, random, randrange, seed
+from tempfile import TemporaryDirectory
+
+try:
+    import numpy as np     # optional: used only with numpy generators
+except ImportError:
+    np = None
 
-__all__ = [ 'shuffle' ]
+__all__ = [ 'shuffle', 'generators', 'sample', 'shuffleFile' ]
 
-def shuffle(pile):
+def shuffle(pile, inPlace=False, rng=None):
     """Returns a new list of the elements of pile in random order.
+    If inPlace is True, pile (a list) is shuffled and returned instead.
+    Random numbers are drawn from rng, a random.Random or a numpy
+    Generator, if given.
+
+    Every ordering of the pile is equally likely: this is the Fisher-Yates
+    shuffle, which swaps each position, from last to first, with a random
+    position at or before it.
 
     >>> shuffle([])
     []
@@ -22,26 +54,153 @@ def shuffle(pile):
     10
     >>> len(set(shuffle(list(range(10)))))
     10
+    >>> pile = list('abcde')
+    >>> shuffle(pile, inPlace=True) is pile
+    True
+    >>> [shuffle(list(range(5)), rng=g) for g in generators(1, 2)] == \\
+    ...     [shuffle(list(range(5)), rng=g) for g in generators(1, 2)]
+    True
     """
-    n = len(pile)
-    result = []
-    copied = []
-    while len(result) != n:
-        location = randint(0,n-1)
-        copied.append(location)
-        result.append(pile[location])
+    result = pile if inPlace else list(pile)
+    n = len(result)
+    if np is not None and isinstance(rng, np.random.Generator):
+        if n > 1:
+            # permute an array of references, rather than the list itself
+            items = np.empty(n, dtype=object)
+            items[:] = result
+            result[:] = items[rng.permutation(n)].tolist()
+        return result
+    draw = rng.randrange if rng is not None else randrange
+    for i in range(n-1, 0, -1):
+        j = draw(i+1)
+        result[i], result[j] = result[j], result[i]
     return result
 
+def generators(seed, count, numpy=False):
+    """Returns a list of count independent random number generators, all
+    determined by seed, for use with shuffle.  With numpy=True, they are
+    numpy Generators, spawned from a common numpy SeedSequence; otherwise,
+    they are random.Random objects, each seeded by hashing seed with its
+    position in the list.
+
+    >>> a, b = generators(2024, 2)
+    >>> a.random() == generators(2024, 2)[0].random() != b.random()
+    True
+    """
+    if numpy:
+        if np is None:
+            raise ImportError("numpy generators require numpy")
+        streams = np.random.SeedSequence(seed).spawn(count)
+        return [np.random.default_rng(stream) for stream in streams]
+    return [Random("shuffle:{}:{}".format(seed, i)) for i in range(count)]
+
+def sample(items, k, rng=None):
+    """Returns a list of k items chosen at random from the iterable items,
+    in random order, reading items just once.  If there are fewer than k
+    items, all are returned, shuffled.  Random numbers are drawn from rng,
+    a random.Random, if given.
+
+    This is reservoir sampling: the first k items fill the reservoir, and
+    each later item replaces a random member with just the right
+    probability.  Rather than roll for every item, we compute how many items
+    to skip before the next replacement ("Algorithm L"), so the work is
+    proportional to k log(n/k), not n.
+
+    >>> len(sample(range(10**6), 5))
+    5
+    >>> sorted(sample('abc', 5))
+    ['a', 'b', 'c']
+    >>> a = sample(iter(range(100)), 3, rng=Random(1))
+    >>> a == sample(iter(range(100)), 3, rng=Random(1))
+    True
+    """
+    draw = rng.random if rng is not None else random
+    items = iter(items)
+    reservoir = list(islice(items, k))
+    if len(reservoir) == k and k > 0:
+        w = exp(log(1.0 - draw())/k)
+        while True:
+            # skip items until the next one that enters the reservoir
+            skip = floor(log(1.0 - draw())/log(1.0 - w))
+            item = next(islice(items, skip, None), _missing)
+            if item is _missing:
+                break
+            reservoir[int(draw()*k)] = item
+            w *= exp(log(1.0 - draw())/k)
+    return shuffle(reservoir, inPlace=True, rng=rng)
+
+# marks the end of an iterator
+_missing = object()
+
+def shuffleFile(source, dest, memory=1<<28, rng=None):
+    """Write the lines of the file named source, shuffled, to the file
+    named (or binary file object) dest, using about memory bytes of memory.
+    Random numbers are drawn from rng, a random.Random, if given.
+
+    Each line is written to one of several temporary "bucket" files, picked
+    at random; each bucket is small enough to be shuffled in memory, and
+    the shuffled buckets are written out one after another.  Every order of
+    the lines is equally likely.
+    >>> import tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> before = os.path.join(directory, 'before')
+    >>> after = os.path.join(directory, 'after')
+    >>> with open(before, 'w') as f:
+    ...     f.write(''.join('line {}\\n'.format(i) for i in range(1000)))
+    8890
+    >>> shuffleFile(before, after, memory=2000)
+    >>> sorted(open(after)) == sorted(open(before))
+    True
+    >>> import io
+    >>> buffer = io.BytesIO()
+    >>> shuffleFile(before, buffer)
+    >>> len(buffer.getvalue())
+    8890
+    """
+    if not hasattr(dest, 'write'):
+        with open(dest, 'wb') as output:    # we opened it, so we close it
+            shuffleFile(source, output, memory, rng)
+        return
+    draw = rng.randrange if rng is not None else randrange
+    # a bucket should fill about half the memory allowed
+    count = max(1, min(2*os.stat(source).st_size//memory + 1, 512))
+    with TemporaryDirectory() as tmp:
+        names = [os.path.join(tmp, str(i)) for i in range(count)]
+        buckets = [open(name, 'wb') for name in names]
+        try:
+            with open(source, 'rb') as lines:
+                for line in lines:
+                    if not line.endswith(b'\n'):
+                        line += b'\n'
+                    buckets[draw(count)].write(line)
+        finally:
+            for bucket in buckets:
+                bucket.close()
+        for name in names:
+            with open(name, 'rb') as bucket:
+                lines = bucket.readlines()
+            dest.writelines(shuffle(lines, inPlace=True, rng=rng))
+        dest.flush()
+
 def test():
     from doctest import testmod
     testmod()
 
 if __name__ == "__main__":
-    from sys import argv
+    from sys import argv, stdin, stdout
     # first, remove the first value, the name of the program.
     argv.pop(0)
-    # shuffle and print the shuffles arguments
-    new = shuffle(argv)
-    print(' '.join(new))
-
-
+    if argv and argv[0] == '-f':
+        # shuffle the lines of a file onto the output
+        stdout.flush()
+        shuffleFile(argv[1], stdout.buffer)
+    elif argv and argv[0] == '-k':
+        # pick k lines, at random, from a file (or the input)
+        source = open(argv[2]) if len(argv) > 2 else stdin
+        with source:
+            for line in sample(source, int(argv[1])):
+                print(line, end='' if line.endswith('\n') else '\n')
+    else:
+        # shuffle and print the shuffles arguments
+        new = shuffle(argv)
+        print(' '.join(new))
@@ -2,15 +2,56 @@
 # There are no errors in *this* file.
 from random import randint,seed
 
-__all__  = ['subsets']
+__all__  = ['subsets', 'graySubsets']
 
-def subsets(universe): # WORKS
-    """Create a stream of all the subsets of 'universe'."""
+def subsets(universe, masks=False): # WORKS
+    """Create a stream of all the subsets of 'universe'.
+    If masks is True, each subset is described by an integer whose bit i
+    is set when universe[i] is in the subset, and no lists are built.
+    >>> list(subsets(['a', 'b']))
+    [[], ['a'], ['b'], ['a', 'b']]
+    >>> list(subsets(['a', 'b'], masks=True))
+    [0, 1, 2, 3]
+    """
     l = len(universe)
-    for dex in range(0,2**l):
+    if masks:
+        yield from range(0, 1 << l)
+        return
+    for dex in range(0, 1 << l):
         result = []
         for i in range(l):
-            if (dex//(2**i))%2 == 1:
+            if (dex >> i) & 1:
                 result.append(universe[i])
         yield result
-        
+
+def graySubsets(universe, weight=None):
+    """Create a stream of (mask, size, total) triples, one for each subset
+    of 'universe'.  Bit i of mask is set when universe[i] is in the subset,
+    size is the number of items in the subset, and total is the sum of
+    weight(item) over its items (0, if weight is not given).
+
+    Subsets are visited in Gray code order: each differs from the one
+    before by a single item, so size and total are kept up to date with
+    constant work per subset.
+    >>> list(graySubsets(['a', 'b']))
+    [(0, 0, 0), (1, 1, 0), (3, 2, 0), (2, 1, 0)]
+    >>> sum(1 for m, size, total in graySubsets([10, 5, 5, 2, 3], weight=int)
+    ...     if total == 15)
+    4
+    """
+    l = len(universe)
+    weights = [weight(item) for item in universe] if weight else [0]*l
+    mask = size = total = 0
+    yield mask, size, total
+    for step in range(1, 1 << l):
+        # flip the item at the position of the lowest set bit of step
+        i = (step & -step).bit_length() - 1
+        bit = 1 << i
+        mask ^= bit
+        if mask & bit:
+            size += 1
+            total += weights[i]
+        else:
+            size -= 1
+            total -= weights[i]
+        yield mask, size, total
@@ -18,38 +18,514 @@ Imagined usage:
     for line in islice(lines(width=70),20):
         print(line)
 
+The functions above use a single, module-wide oracle.  Any number of
+independent oracles may be made with the Oracle class; each is fixed when
+it is made, and every stream it generates draws from its own random number
+generator, so streams may be consumed from different threads:
+    austen = Oracle(text, n=3)
+    for line in islice(austen.lines(width=70, seed=1), 20):
+        print(line)
+
+A fingerprint may be computed once and saved, then loaded quickly by any
+number of processes:
+    python3 oracle.py -b austen.oracle 4 PrideAndPrejudice.txt
+    python3 oracle.py -m austen.oracle
+
+Corpora too large to join into one string are fingerprinted a piece at a
+time by a Fingerprinter, which counts the n-grams of each chunk of a
+document (carrying the last n-1 characters over to the next), and which
+may be given more documents, or an existing oracle to extend, at any time:
+    builder = Fingerprinter(n=3)
+    with open('PrideAndPrejudice.txt') as source:
+        builder.update(lineChunks(source))
+    austen = builder.oracle()
+Fingerprints of separate documents are merged by adding their counts, so
+fingerprintFiles computes those of many files in parallel, one process per
+core, and produces the same model as a serial build.
+
 Approaches to selecting appropriate n:
 [extra credit commentary]
 """
-from random import choice
-from itertools import islice
+from random import Random
+from itertools import islice, accumulate
+from collections import Counter
+from operator import itemgetter
+from array import array
+import mmap
+import os
+import struct
+import sys
+from multiprocessing import Pool
+from tempfile import NamedTemporaryFile
+
+__all__ = ['Oracle', 'Fingerprinter', 'lineChunks', 'fingerprintFiles',
+           'fingerprint', 'load', 'chars', 'words', 'lines']
+
+def _buildAlias(counts, lo, hi, cut, alias):
+    """Fill entries lo through hi-1 of cut and alias with the alias table
+    of the distribution counts[lo:hi].
+
+    The alias method draws from the distribution in constant time: pick an
+    entry i between lo and hi uniformly, then keep i with probability
+    cut[i], or take entry alias[i] instead.
+    """
+    m = hi - lo
+    total = sum(counts[lo:hi])
+    # scale probabilities so that the average is 1
+    scaled = [counts[i]*m/total for i in range(lo, hi)]
+    small = [i for i in range(m) if scaled[i] < 1.0]
+    large = [i for i in range(m) if scaled[i] >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        # entry s keeps its own share; entry l makes up the rest
+        cut[lo+s] = scaled[s]
+        alias[lo+s] = lo+l
+        scaled[l] -= 1.0 - scaled[s]
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+
+def _draw(endings, offsets, cut, alias, k, random):
+    """Draw the completion of key number k from alias tables, using the
+    function random for random numbers."""
+    lo = offsets[k]
+    u = random()*(offsets[k+1] - lo)
+    i = int(u)
+    e = lo + i
+    return endings[e] if u - i < cut[e] else endings[alias[e]]
+
+def _tabulate(counter):
+    """Given a Counter of strings, return the flat tables (keys, offsets,
+    endings, counts, cut, alias) of the distribution of the last character
+    of the strings given the rest."""
+    # sorting the strings brings the completions of each key together
+    ordered = sorted(counter)
+    counts = array('I', map(counter.__getitem__, ordered))
+    endings = ''.join(map(itemgetter(-1), ordered))
+    prefixes = list(map(itemgetter(slice(0, -1)), ordered))
+    sizes = Counter(prefixes)          # completions of each key, in order
+    keys = list(sizes)
+    offsets = array('I', [0])
+    offsets.extend(accumulate(sizes.values()))
+    cut = array('f', [1.0])*len(counts)
+    alias = array('I', range(len(counts)))
+    for lo, hi in zip(offsets, offsets[1:]):
+        if hi - lo > 1:
+            _buildAlias(counts, lo, hi, cut, alias)
+    return keys, offsets, endings, counts, cut, alias
+
+# Fingerprint files.  A header (see _fileHeader) is followed by sections
+# of 4-byte items, each of which may be mapped directly as an array:
+#    keys             - #keys * (n-1) characters, in UTF-32-BE, in order
+#    offsets          - #keys + 1 unsigned ints
+#    endings          - #entries characters, in UTF-32-BE
+#    counts, cut, alias         - #entries unsigned ints, floats, and ints
+#    chars, charCut, charAlias, charCounts
+#                     - #chars characters, floats, ints, and unsigned ints
+# Big-endian UTF-32 keys sort, byte by byte, in the order of the keys.
+_fileMagic = b'ORACLE02'
+_fileHeader = struct.Struct('=8s8sqqqq')   # magic, byte order, n,
+                                           # #keys, #entries, #chars
+
+class _KeyTable(object):
+    """The keys of a mapped fingerprint file, as a read-only list."""
+
+    __slots__ = ['_data', '_width']
+
+    def __init__(self, data, width):
+        self._data = data          # UTF-32-BE characters of every key
+        self._width = width        # bytes per key
+
+    def __getitem__(self, k):
+        if not 0 <= k < len(self):
+            raise IndexError("key index out of range")
+        w = self._width
+        return bytes(self._data[k*w:(k+1)*w]).decode('utf-32-be')
+
+    def __len__(self):
+        return len(self._data)//self._width if self._width else 1
+
+    def __iter__(self):
+        text = bytes(self._data).decode('utf-32-be')
+        if not self._width:
+            return iter([''])
+        w = self._width//4
+        return (text[i:i+w] for i in range(0, len(text), w))
+
+class Oracle(object):
+    """A fingerprint of a source text -- the distribution of its n-grams --
+    from which streams of similar text are generated.
+
+    An oracle does not change once it is made.  For each key, a string of
+    n-1 characters, it keeps the counts of the characters that follow the
+    key in the text, and alias tables (see _buildAlias) for drawing them:
+      _keys      - a list of the distinct keys
+      _index     - a dictionary mapping each key to its position in _keys
+      _offsets   - the completions of _keys[k] are entries _offsets[k]
+                   through _offsets[k+1]-1 of the arrays below
+      _endings   - a string with the completion character of each entry
+      _counts    - the number of times each entry's n-gram appears
+      _cut, _alias - the alias tables of the completions of each key
+      _chars     - (characters, cut, alias, counts) for drawing from all
+                   characters
+    An oracle may be saved to a file, and loaded from it with very little
+    work (see save and load).
+
+    >>> oracle = Oracle('yaddayadda', n=3)
+    >>> ''.join(islice(oracle.chars(seed=1), 9)) in 'yadda' * 4
+    True
+    """
+
+    __slots__ = ['_n', '_keys', '_index', '_offsets', '_endings', '_counts',
+                 '_cut', '_alias', '_chars', '_data']
+
+    def __init__(self, text='', n=4, _counts=None):
+        """Scan the text and compute the distribution of n-grams.  (An
+        oracle is also made from the counts of a Fingerprinter.)"""
+        self._n = n
+        if _counts is None:
+            # count each n-gram, sliding an n-character "window" across
+            # the text
+            grams = Counter(text[begin:begin+n]
+                            for begin in range(len(text)-n+1))
+            letters = Counter(text)
+        else:
+            grams, letters = _counts
+        (self._keys, self._offsets, self._endings, self._counts,
+         self._cut, self._alias) = _tabulate(grams)
+        self._index = {key: k for k, key in enumerate(self._keys)}
+        # single characters are drawn as completions of the empty key
+        letters = _tabulate(letters)
+        self._chars = (letters[2], letters[4], letters[5], letters[3])
+        self._data = None
+
+    def save(self, filename):
+        """Write this oracle's fingerprint to the file filename.  It is
+        written to a temporary file that replaces filename only once it is
+        complete, so the file is never seen partly written.
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'yadda.oracle')
+        >>> Oracle('yaddayadda', n=3).save(path)
+        >>> oracle = Oracle.load(path)
+        >>> oracle.n, list(oracle._keys)
+        (3, ['ad', 'ay', 'da', 'dd', 'ya'])
+        >>> ''.join(islice(oracle.chars(seed=1), 9)) in 'yadda' * 4
+        True
+        """
+        chars, charCut, charAlias, charCounts = self._chars
+        header = _fileHeader.pack(_fileMagic, sys.byteorder.encode().ljust(8),
+                                  self._n, len(self._keys),
+                                  len(self._counts), len(chars))
+        directory = os.path.dirname(os.path.abspath(filename))
+        with NamedTemporaryFile('wb', dir=directory, delete=False) as out:
+            try:
+                out.write(header)
+                out.write(''.join(self._keys).encode('utf-32-be'))
+                out.write(array('I', self._offsets))
+                out.write(self._endings.encode('utf-32-be'))
+                out.write(array('I', self._counts))
+                out.write(array('f', self._cut))
+                out.write(array('I', self._alias))
+                out.write(chars.encode('utf-32-be'))
+                out.write(array('f', charCut))
+                out.write(array('I', charAlias))
+                out.write(array('I', charCounts))
+            except BaseException:
+                out.close()
+                os.unlink(out.name)
+                raise
+        os.replace(out.name, filename)
+
+    @staticmethod
+    def load(filename):
+        """Map the fingerprint saved (see save) in the file filename.
+        The counts and alias tables are used in place, so processes that
+        load the same file share its pages; only the completion characters
+        are decoded, and the keys are indexed when first looked up.
+        Raises ValueError if the file is not a whole fingerprint file.
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'yadda.oracle')
+        >>> Oracle('yaddayadda', n=3).save(path)
+        >>> os.truncate(path, os.path.getsize(path) - 4)
+        >>> Oracle.load(path)                   # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+          ...
+        ValueError: ... is not a fingerprint file
+        """
+        with open(filename, 'rb') as source:
+            data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < _fileHeader.size:
+            raise ValueError("{} is not a fingerprint file".format(filename))
+        magic, order, n, keys, entries, chars = _fileHeader.unpack_from(data)
+        if (magic != _fileMagic or order.rstrip() != sys.byteorder.encode()
+                or n < 1 or len(data) != _fileHeader.size + 4*(
+                    keys*(n-1) + keys + 1 + 4*entries + 4*chars)):
+            raise ValueError("{} is not a fingerprint file".format(filename))
+        view = memoryview(data)
+        position = _fileHeader.size
+        sections = []
+        for items, code in ((keys*(n-1), 'B'), (keys+1, 'I'),
+                            (entries, 'B'), (entries, 'I'), (entries, 'f'),
+                            (entries, 'I'), (chars, 'B'), (chars, 'f'),
+                            (chars, 'I'), (chars, 'I')):
+            section = view[position:position + 4*items]
+            sections.append(section if code == 'B' else section.cast(code))
+            position += 4*items
+        oracle = Oracle.__new__(Oracle)
+        oracle._n = n
+        oracle._keys = _KeyTable(sections[0], 4*(n-1))
+        oracle._index = None
+        oracle._offsets = sections[1]
+        oracle._endings = bytes(sections[2]).decode('utf-32-be')
+        oracle._counts, oracle._cut, oracle._alias = sections[3:6]
+        oracle._chars = (bytes(sections[6]).decode('utf-32-be'),
+                         sections[7], sections[8], sections[9])
+        oracle._data = data
+        return oracle
+
+    def _lookup(self, key):
+        """The position of key in _keys, or None."""
+        if self._index is None:
+            self._index = {key: k for k, key in enumerate(self._keys)}
+        return self._index.get(key)
+
+    @property
+    def n(self):
+        """The size of the n-grams of this oracle."""
+        return self._n
+
+    def _randomChar(self, rng):
+        """Draw a random character from the text, using the Random rng."""
+        endings, cut, alias, counts = self._chars
+        return _draw(endings, (0, len(endings)), cut, alias, 0, rng.random)
+
+    def _randomKey(self, rng):
+        """Draw a random key, using the Random rng."""
+        return rng.choice(self._keys)
+
+    def _randomCompletion(self, key, rng):
+        """If key can be completed as an n-gram, pick a random completion.
+        Otherwise, return a random character.  Uses the Random rng."""
+        k = self._lookup(key)
+        if k is None:  # can this happen?!
+            return self._randomChar(rng)
+        return _draw(self._endings, self._offsets, self._cut, self._alias,
+                     k, rng.random)
+
+    def chars(self, seed=None):
+        """Generate characters from a random start according to the
+        oracle's fingerprint of the source text.  Each stream has its own
+        random number generator, seeded with seed (if given).
+
+        >>> oracle = Oracle('the cat sat on the mat', n=3)
+        >>> a = ''.join(islice(oracle.chars(seed=7), 30))
+        >>> a == ''.join(islice(oracle.chars(seed=7), 30))
+        True
+        """
+        rng = Random(seed)
+        key = self._randomKey(rng)
+        while True:
+            c = self._randomCompletion(key, rng)
+            yield c
+            # drop the first character of the key, and add the new one
+            key = (key + c)[1:] if key else key
 
-__all__ = ['fingerprint', 'chars', 'words', 'lines']
+    def words(self, maxlen=20, seed=None):
+        """Generate 'words' from a random start, according to the
+        oracles's fingerprint of the source test. Words are runs of at most
+        maxlen characters that appear between whitespace characters.  Any
+        reading continuity is preserved between words."""
+        word = ''
+        for c in self.chars(seed):
+            if c.isspace():
+                if word:
+                    yield word
+                word = ''
+            else:
+                if len(word) >= maxlen:
+                    yield word
+                    word = ''
+                word += c
 
-# These private global variables keep track of the state of the oracle:
-#  _text - a string that contains all of the source text.
-#  _n    - the size of the window used to develop a distribution of "n-grams"
-#  _dist - the distribution of completions of _n-1 character keys
-_text = ''
-_n = 4
-_dist = dict()
+    def lines(self, width=80, seed=None):
+        """Generate lines of at most 'width' characters, according to the
+        fingerprint.  Lines end on a word boundary.  Any reading
+        continuity will be preserved between lines.
+
+        >>> oracle = Oracle('the cat sat on the mat ' * 5, n=4)
+        >>> all(len(line) <= 12 for line in islice(oracle.lines(12), 50))
+        True
+        """
+        line = ''
+        for word in self.words(maxlen=width, seed=seed):
+            if line and len(line) + 1 + len(word) > width:
+                yield line
+                line = word
+            else:
+                line = line + ' ' + word if line else word
+
+class Fingerprinter(object):
+    """A builder of fingerprints from text that arrives a piece at a time.
+
+    Text is fed to a fingerprinter in chunks; the last n-1 characters of
+    each chunk are carried over to the next, so that the n-grams spanning
+    chunks are counted just as if the whole document were one string.
+    Only the counts of distinct n-grams are kept, so memory does not grow
+    with the size of the text.  At any point, oracle() makes an Oracle of
+    everything seen so far, and more documents may still be added.
+
+    >>> builder = Fingerprinter(n=3)
+    >>> builder.update(['yad', 'da', 'yadda'])
+    >>> oracle = builder.oracle()
+    >>> list(oracle._keys) == list(Oracle('yaddayadda', n=3)._keys)
+    True
+    >>> builder = Fingerprinter(n=6)
+    >>> builder.update(list('I am ok now'))    # one character at a time
+    >>> oracle = builder.oracle()
+    >>> expected = Oracle('I am ok now', n=6)
+    >>> (oracle._keys, oracle._counts) == (expected._keys, expected._counts)
+    True
+    """
+
+    __slots__ = ['_n', '_grams', '_letters', '_tail']
+
+    def __init__(self, n=4, oracle=None):
+        """Start a fingerprint of n-grams, or, if oracle is given,
+        continue the fingerprint of that oracle."""
+        self._grams = Counter()
+        self._letters = Counter()
+        self._tail = ''
+        self._n = n
+        if oracle is not None:
+            self._n = n = oracle.n
+            offsets, endings = oracle._offsets, oracle._endings
+            counts = oracle._counts
+            for k, key in enumerate(oracle._keys):
+                for e in range(offsets[k], offsets[k+1]):
+                    self._grams[key + endings[e]] = counts[e]
+            chars, cut, alias, charCounts = oracle._chars
+            self._letters.update(dict(zip(chars, charCounts)))
+
+    @property
+    def n(self):
+        """The size of the n-grams counted."""
+        return self._n
+
+    def feed(self, chunk):
+        """Count the n-grams of the next chunk of the current document."""
+        n = self._n
+        text = self._tail + chunk
+        self._grams.update(text[begin:begin+n]
+                           for begin in range(len(text)-n+1))
+        self._letters.update(chunk)
+        # keep the last n-1 characters to begin the next chunk's n-grams
+        self._tail = text[-(n-1):] if n > 1 else ''
+
+    def endDocument(self):
+        """End the current document: no n-gram will span its end."""
+        self._tail = ''
+
+    def update(self, document):
+        """Count the n-grams of a whole document, a string or an iterable
+        of strings (for example, lineChunks of a file)."""
+        if isinstance(document, str):
+            document = [document]
+        for chunk in document:
+            self.feed(chunk)
+        self.endDocument()
+
+    def merge(self, other):
+        """Add the counts of the fingerprinter other to these, and return
+        this fingerprinter.  Counts are simply summed, so fingerprints of
+        separate documents may be merged in any order.
+        >>> a, b = Fingerprinter(n=2), Fingerprinter(n=2)
+        >>> a.update('abab'); b.update('abc')
+        >>> sorted(a.merge(b)._grams.items())
+        [('ab', 3), ('ba', 1), ('bc', 1)]
+        """
+        if other._n != self._n:
+            raise ValueError("cannot merge {}-grams with {}-grams".format(
+                other._n, self._n))
+        self._grams.update(other._grams)
+        self._letters.update(other._letters)
+        return self
+
+    def oracle(self):
+        """Make an Oracle of the text seen so far.
+        >>> builder = Fingerprinter(n=2, oracle=Oracle('abab', n=2))
+        >>> builder.update('ac')
+        >>> sorted(builder.oracle()._keys)
+        ['a', 'b']
+        """
+        return Oracle(n=self._n, _counts=(self._grams, self._letters))
+
+def lineChunks(source):
+    """Generate the lines of the file source, stripped of surrounding
+    spaces and separated by single spaces: chunks of the same text as
+        ' '.join([line.strip() for line in source])
+    """
+    separator = ''
+    for line in source:
+        yield separator + line.strip()
+        separator = ' '
+
+def _fingerprintFile(job):
+    """Fingerprint one file; job is a pair (filename, n)."""
+    name, n = job
+    builder = Fingerprinter(n)
+    with open(name) as source:
+        builder.update(lineChunks(source))
+    return builder
+
+def fingerprintFiles(names, n=4, processes=None):
+    """Return a Fingerprinter of the n-grams of the files named in names,
+    each a separate document of lineChunks.  Each file is fingerprinted by
+    one of a pool of worker processes (at most one per core, or processes,
+    if given), and the partial fingerprints are merged; the result is
+    exactly that of feeding the files, one after another, to one
+    Fingerprinter.
+    >>> import tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> names = [os.path.join(directory, str(i)) for i in range(3)]
+    >>> for name, text in zip(names, ['to be or\\n', 'not to\\n be', 'be']):
+    ...     with open(name, 'w') as f:
+    ...         _ = f.write(text)
+    >>> serial = Fingerprinter(n=3)
+    >>> for text in ['to be or', 'not to be', 'be']:
+    ...     serial.update(text)
+    >>> fingerprintFiles(names, n=3, processes=2)._grams == serial._grams
+    True
+    """
+    jobs = [(name, n) for name in names]
+    # no more workers than there are files
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    builder = Fingerprinter(n)
+    if processes <= 1:
+        for part in map(_fingerprintFile, jobs):
+            builder.merge(part)
+        return builder
+    with Pool(processes) as pool:
+        for part in pool.imap_unordered(_fingerprintFile, jobs):
+            builder.merge(part)
+    return builder
+
+# The module-wide oracle, and the random number generator used by the
+# module-wide functions below.
+_oracle = Oracle()
+_random = Random()
 
 def fingerprint(text, n=4):
-    """Scan the text and compute the distribution of n-grams."""
-    global _n, _dist, _text   # ie. we're referencing variables *above*
-    _text = text              # set the state of the fingerprint
-    _n = n
-    _dist = dict()
-
-    # now, map (n-1) character keys to a list of all valid completions.
-    # built by sliding an n-character "window" across the _text.
-    l = len(_text)
-    for begin in range(0, l-_n+1):  # begin is index of left side of window
-        window = _text[begin:begin+_n] # get window - an n-gram
-        key = window[:-1]              # key is n-1 char prefix
-        completion = window[-1]        # completion is final char
-        # important: get fetches the value associated with key, else ''
-        _dist[key] = _dist.get(key, '') + completion  # add to all compl'ns
+    """Scan the text and compute the distribution of n-grams, replacing the
+    module-wide oracle."""
+    global _oracle
+    _oracle = Oracle(text, n)
+
+def load(filename):
+    """Load a fingerprint saved by Oracle.save from the file filename,
+    replacing the module-wide oracle."""
+    global _oracle
+    _oracle = Oracle.load(filename)
 
 def _randomChar():
     """Draw a random character from the text.
@@ -62,30 +538,22 @@ def _randomChar():
     >>> set([_randomChar() for _ in range(1000)]) == set(s)
     True
     """
-    global _text
-    return choice(_text)
+    return _oracle._randomChar(_random)
 
 def _randomKey():
     """Draw a random n-1 character n-gram prefix, or key, from dist."""
-    global _dist
-
-    # We wonder: Can this be simplified?
-    domain = []
-    for key in _dist:
-        domain.append(key)
-    return choice(domain)
-    
+    return _oracle._randomKey(_random)
+
 def _randomCompletion(key):
     """If key can be completed as an n-gram, pick a random completion.
-    Otherwise, return a random character."""
-    global _dist
-    if key in _dist:
-        result = choice(_dist[key])
-    else:  # can this happen?!
-        result = _randomChar()
-    return result
-
-#### STUDENTS: all code to be completed is below this line (see 'pass') ####
+    Otherwise, return a random character.
+
+    >>> fingerprint('abacad', n=2)
+    >>> sorted(set(_randomCompletion('a') for _ in range(1000)))
+    ['b', 'c', 'd']
+    """
+    return _oracle._randomCompletion(key, _random)
+
 def chars():
     """Generate characters from a random start according to the oracle's
        fingerprint of the source text.
@@ -95,40 +563,20 @@ def chars():
     >>> chunk in 'yaddayadda'
     True
     """
-    ran_key = _randomKey() # a variable for random key
-    while True:
-        ngram_gen = _randomCompletion(_randomKey()) # generates a random character
-        yield ngram_gen
-        ran_key = ran_key[1:] + ngram_gen #drops first character of key and adds character to make a new key 
-
+    return _oracle.chars()
 
 def words(maxlen=20):
     """Generate 'words' from a random start, according to the oracles's
     fingerprint of the source test. Words are runs of at most maxlen
     characters that appear between whitespace characters.  Any reading
     continuity is preserved between words."""
+    return _oracle.words(maxlen)
 
-    word = ''
-    for c in chars():
-        if c.isspace() == True or len(word)>=20: #tests whether the character is a space or the word has more than 20 characters
-            yield word # yield the word if conditions are met
-            word = ''
-        else:
-            word += c # add more characters into the word if conditions are not met
-                    
-    
 def lines(width=80):
     """Generate lines of at most 'width' characters, according to the fingerprint.  
     Lines have a maximum length width characters and end on a word boundary.
     Any reading continuity will be preserved between lines."""
-
-    lineWords = []
-    for word in words():
-        if len(lineWords)>= 80: # tests whether the line length has exceeded 80
-            yield lineWords # yield the line if condition is met
-            lineWords.clear()
-        else:
-            lineWords.append(word) # add more words to the line if condition is not met
+    return _oracle.lines(width)
 
 def test():
     """Run document tests."""
@@ -136,10 +584,18 @@ def test():
     doctest.testmod()
 
 if __name__ == "__main__":
-    with open('PrideAndPrejudice.txt') as source:
-        text = ' '.join([line.strip() for line in source])
-
-    fingerprint(text,n=4)
+    from sys import argv
+    if len(argv) > 3 and argv[1] == '-b':
+        # build a fingerprint file from texts:  -b model n text...
+        fingerprintFiles(argv[4:], int(argv[3])).oracle().save(argv[2])
+    else:
+        if len(argv) > 2 and argv[1] == '-m':
+            # generate from a prebuilt fingerprint file:  -m model
+            load(argv[2])
+        else:
+            with open('PrideAndPrejudice.txt') as source:
+                text = ' '.join([line.strip() for line in source])
+            fingerprint(text,n=4)
 
-    for line in islice(lines(),20):
-        print(line)
+        for line in islice(lines(),20):
+            print(line)